@@ -0,0 +1,32 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
+
+
+class ArtworkCache:
+    """Картинки оформления, загружаемые при первом использовании.
+
+    Каждая картинка масштабируется один раз под нужный размер и плотность
+    пикселей экрана, исходник после этого не хранится. release() освобождает
+    все, когда оформление больше не показывается.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths  # Имя -> путь к файлу
+        self.scaled = {}  # (имя, ширина, высота, dpr) -> готовый QPixmap
+
+    def pixmap(self, name, width, height, dpr):
+        """Картинка name размером width x height логических пикселей (None, если файл не загрузился)"""
+        key = (name, width, height, dpr)
+        pixmap = self.scaled.get(key)
+        if pixmap is None:
+            source = QPixmap(str(self.paths[name]))
+            if source.isNull():
+                return None
+            pixmap = source.scaled(round(width * dpr), round(height * dpr), Qt.IgnoreAspectRatio,
+                                   Qt.SmoothTransformation)
+            pixmap.setDevicePixelRatio(dpr)
+            self.scaled[key] = pixmap
+        return pixmap
+
+    def release(self):
+        self.scaled.clear()
@@ -0,0 +1,179 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from components.audio_events import MUSIC_END_EVENT
+from components.utils import get_resource_path
+
+DECK_CHANNELS = (0, 1)  # Каналы микшера, зарезервированные под деки
+UI_CHANNEL = 2  # Канал микшера, зарезервированный под звуки интерфейса
+UI_SOUNDS = {
+    "alarm": ("music/alarm.wav", 0.11),  # Имя -> (файл, громкость)
+}
+
+
+class AudioEngine:
+    """Вывод звука через pygame.
+
+    При crossfade_ms == 0 играет один поток pygame.mixer.music. При
+    crossfade_ms > 0 работают две деки: треки декодируются в
+    pygame.mixer.Sound и играют на двух каналах, уходящий трек затухает,
+    пока входящий нарастает. Обе рампы выполняет SDL_mixer внутри аудио-потока.
+
+    Звуки интерфейса (сигнал таймера) декодируются заранее при init() и
+    играют на своем канале поверх музыки, не завися от ее громкости.
+    """
+
+    def __init__(self, crossfade_ms=0, mixer_settings=None):
+        self.crossfade_ms = crossfade_ms
+        self.mixer_settings = mixer_settings or {}  # frequency, size, channels, buffer для pygame.mixer.init
+        self.decks = []  # Каналы дек (пусто в режиме одного потока)
+        self.sounds = [None, None]  # Треки на деках
+        self.active = 0  # Индекс деки, которая играет текущий трек
+        self.volume = 1.0
+        self.decoder = ThreadPoolExecutor(max_workers=1)  # Фоновое декодирование следующего трека
+        self.lock = threading.Lock()
+        self.prepared_song = None
+        self.prepared = None  # Future с декодированным следующим треком
+        self.ui_channel = None
+        self.ui_sounds = {}  # Имя -> декодированный pygame.mixer.Sound
+
+    @property
+    def uses_decks(self):
+        return bool(self.decks)
+
+    def init(self):
+        pygame.mixer.init(**self.mixer_settings)
+        pygame.mixer.music.set_endevent(MUSIC_END_EVENT)
+        # Деки и канал интерфейса не отдаются под автоматический выбор канала
+        pygame.mixer.set_reserved(UI_CHANNEL + 1)
+        self.ui_channel = pygame.mixer.Channel(UI_CHANNEL)
+        for name, (path, volume) in UI_SOUNDS.items():
+            sound = pygame.mixer.Sound(get_resource_path(path))
+            sound.set_volume(volume)
+            self.ui_sounds[name] = sound
+        if self.crossfade_ms > 0:
+            self.decks = [pygame.mixer.Channel(i) for i in DECK_CHANNELS]
+            for deck in self.decks:
+                deck.set_endevent(MUSIC_END_EVENT)
+
+    def play(self, song, buffer=None, volume=None):
+        """Запускает трек; в режиме дек - с кроссфейдом от текущего.
+
+        volume - громкость нового трека. Уходящая дека ее не получает и
+        затухает со своей громкостью.
+        """
+        if volume is not None:
+            self.volume = volume
+        if not self.decks:
+            if buffer is not None:
+                pygame.mixer.music.load(buffer, song)
+            else:
+                pygame.mixer.music.load(song)
+            pygame.mixer.music.play()
+            if volume is not None:
+                pygame.mixer.music.set_volume(volume)
+            return
+
+        sound = self._take_prepared(song)
+        if sound is None:
+            sound = pygame.mixer.Sound(buffer if buffer is not None else song)
+
+        outgoing = self.decks[self.active]
+        incoming_index = 1 - self.active
+        incoming = self.decks[incoming_index]
+        overlap = self.crossfade_ms if outgoing.get_busy() else 0
+
+        incoming.set_volume(self.volume)
+        incoming.play(sound, fade_ms=overlap)
+        if overlap:
+            outgoing.fadeout(overlap)
+        else:
+            outgoing.stop()
+            self.sounds[self.active] = None
+        self.sounds[incoming_index] = sound
+        self.active = incoming_index
+
+    def prepare(self, song):
+        """Декодирует следующий трек в фоне (только в режиме дек)"""
+        if not self.decks or not song:
+            return
+        with self.lock:
+            if self.prepared_song == song:
+                return
+            self.prepared_song = song
+            self.prepared = self.decoder.submit(pygame.mixer.Sound, song)
+
+    def _take_prepared(self, song):
+        with self.lock:
+            future = self.prepared if self.prepared_song == song else None
+            self.prepared_song = None
+            self.prepared = None
+        if future is None or not future.done():
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def track_length_ms(self):
+        """Длина текущего трека (известна только в режиме дек)"""
+        sound = self.sounds[self.active] if self.decks else None
+        return int(sound.get_length() * 1000) if sound is not None else None
+
+    def pause(self):
+        if self.decks:
+            for deck in self.decks:
+                deck.pause()
+        else:
+            pygame.mixer.music.pause()
+
+    def unpause(self):
+        if self.decks:
+            for deck in self.decks:
+                deck.unpause()
+        else:
+            pygame.mixer.music.unpause()
+
+    def halt_decks(self):
+        """Останавливает деки (поток pygame.mixer.music не трогает)"""
+        for deck in self.decks:
+            deck.stop()
+
+    def unload(self):
+        if self.decks:
+            self.halt_decks()
+            self.sounds = [None, None]
+        else:
+            pygame.mixer.music.unload()
+
+    def set_volume(self, value):
+        self.volume = value
+        if self.decks:
+            self.decks[self.active].set_volume(value)
+        else:
+            pygame.mixer.music.set_volume(value)
+
+    def play_sound(self, name):
+        """Звук интерфейса поверх музыки"""
+        self.ui_channel.play(self.ui_sounds[name])
+
+    def pause_sounds(self):
+        self.ui_channel.pause()
+
+    def unpause_sounds(self):
+        self.ui_channel.unpause()
+
+    def is_busy(self):
+        if self.decks:
+            return any(deck.get_busy() for deck in self.decks)
+        return pygame.mixer.music.get_busy()
+
+    def quit(self):
+        self.decoder.shutdown(wait=False)
+        pygame.mixer.music.stop()
+        self.halt_decks()
+        if self.ui_channel is not None:
+            self.ui_channel.stop()
+        pygame.mixer.quit()
@@ -0,0 +1,41 @@
+import pygame
+from PyQt5.QtCore import QThread, pyqtSignal
+
+MUSIC_END_EVENT = pygame.USEREVENT + 1  # pygame.mixer.music закончил играть трек
+STOP_EVENT = pygame.USEREVENT + 2  # Команда на завершение потока
+
+
+def wait_for_music_events(on_music_end):
+    """Ждет события конца трека и вызывает on_music_end, пока не придет STOP_EVENT.
+
+    Пока ничего не играет, поток спит в pygame.event.wait() и не просыпается.
+    """
+    # Очереди событий SDL нужна видео-подсистема, окно при этом не создается
+    pygame.display.init()
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([MUSIC_END_EVENT, STOP_EVENT])
+    while True:
+        event = pygame.event.wait()
+        if event.type == STOP_EVENT:
+            break
+        if event.type == MUSIC_END_EVENT:
+            on_music_end()
+    pygame.display.quit()
+
+
+def stop_waiting_for_music_events():
+    pygame.event.post(pygame.event.Event(STOP_EVENT))
+
+
+class MusicEndWatcher(QThread):
+    """Поток, который ждет событие конца трека из очереди событий pygame"""
+    music_ended = pyqtSignal()
+
+    def run(self):
+        wait_for_music_events(self.music_ended.emit)
+
+    def stop(self):
+        """Остановка потока"""
+        if self.isRunning():
+            stop_waiting_for_music_events()
+            self.wait()
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pygame
+
+BUFFER_SIZES = (256, 512, 1024, 2048, 4096)  # Размеры буфера микшера для проверки, в сэмплах
+MEASURE_SECONDS = 3.0  # Длительность проверки одного размера буфера
+BLOCK_END_EVENT = pygame.USEREVENT + 3  # Закончился очередной блок тишины
+
+
+def _cpu_load(stopped):
+    # Нагрузка на процессор, при которой слабый буфер начинает "хрипеть"
+    while not stopped.is_set():
+        sum(i * i for i in range(10000))
+
+
+def measure_buffer(buffer, frequency=44100, size=-16, channels=2, seconds=MEASURE_SECONDS, load_threads=2):
+    """Проверяет один размер буфера микшера.
+
+    Блоки тишины играют друг за другом через Channel.queue, а время конца
+    каждого блока сравнивается с его длительностью. Если аудио-поток не
+    успел подготовить буфер вовремя, конец блока приходит позже, чем на
+    длительность буфера, - такие блоки считаются опустошениями буфера.
+    """
+    pygame.mixer.init(frequency=frequency, size=size, channels=channels, buffer=buffer)
+    try:
+        frequency, size, channels = pygame.mixer.get_init()
+        buffer_ms = buffer * 1000 / frequency
+        # Блок заметно длиннее буфера, чтобы следующий успевали поставить в очередь
+        block_ms = max(50.0, buffer_ms * 4)
+        frames = int(frequency * block_ms / 1000)
+        block = pygame.mixer.Sound(buffer=bytes(frames * abs(size) // 8 * channels))
+
+        channel = pygame.mixer.Channel(0)
+        channel.set_endevent(BLOCK_END_EVENT)
+        pygame.event.clear()
+
+        stopped = threading.Event()
+        load = [threading.Thread(target=_cpu_load, args=(stopped,), daemon=True) for _ in range(load_threads)]
+        for thread in load:
+            thread.start()
+
+        ends = []
+        start = time.perf_counter()
+        channel.play(block)
+        channel.queue(block)
+        while time.perf_counter() - start < seconds:
+            event = pygame.event.wait(100)
+            if event.type == BLOCK_END_EVENT:
+                ends.append(time.perf_counter())
+                channel.queue(block)
+
+        stopped.set()
+        for thread in load:
+            thread.join()
+        channel.stop()
+    finally:
+        pygame.mixer.quit()
+
+    intervals = [(b - a) * 1000 for a, b in zip(ends, ends[1:])]
+    return {
+        "buffer": buffer,
+        "buffer_ms": buffer_ms,
+        "latency_ms": (ends[0] - start) * 1000 - block_ms if ends else None,
+        "underruns": sum(1 for interval in intervals if interval > block_ms + buffer_ms),
+        "jitter_ms": max((abs(interval - block_ms) for interval in intervals), default=0.0),
+        "blocks": len(ends),
+    }
+
+
+def measure_output_latency(frequency=44100, size=-16, channels=2, buffer_sizes=BUFFER_SIZES):
+    """Проверяет все размеры буфера, возвращает список результатов"""
+    # Очереди событий SDL нужна видео-подсистема, окно при этом не создается
+    pygame.display.init()
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([BLOCK_END_EVENT])
+    try:
+        return [measure_buffer(buffer, frequency, size, channels) for buffer in buffer_sizes]
+    finally:
+        pygame.display.quit()
+
+
+def print_latency_report(results):
+    print("Буфер | Буфер, мс | Задержка, мс | Опустошения | Джиттер, мс | Блоков")
+    for result in results:
+        latency = f"{result['latency_ms']:.1f}" if result["latency_ms"] is not None else "-"
+        print(f"{result['buffer']:5d} | {result['buffer_ms']:9.1f} | {latency:>12} | "
+              f"{result['underruns']:11d} | {result['jitter_ms']:11.1f} | {result['blocks']:6d}")
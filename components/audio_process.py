@@ -0,0 +1,247 @@
+import ctypes
+import io
+import multiprocessing
+import threading
+from multiprocessing.sharedctypes import RawValue
+
+from components.utils import log_error
+
+STATE_STOPPED = 0
+STATE_PLAYING = 1
+STATE_PAUSED = 2
+
+VOLUME_POLL_INTERVAL = 0.02  # Как часто процесс звука подхватывает громкость во время игры
+
+
+class ControlBlock(ctypes.Structure):
+    """Общая память между UI-процессом и процессом звука"""
+    _fields_ = [
+        ("volume", ctypes.c_double),  # Громкость, пишет UI-процесс (и процесс звука при смене трека)
+        ("state", ctypes.c_int),  # STATE_*, пишет процесс звука
+        ("busy", ctypes.c_int),  # Играет ли что-нибудь, пишет процесс звука
+        ("position_ms", ctypes.c_long),  # Позиция в треке, пишет процесс звука
+        ("length_ms", ctypes.c_long),  # Длина трека (-1, если неизвестна), пишет процесс звука
+    ]
+
+
+def run_engine_process(commands, events, block, crossfade_ms, mixer_settings):
+    """Точка входа процесса звука: AudioEngine, команды по pipe, состояние в общей памяти"""
+    import pygame
+
+    from components.audio_engine import AudioEngine
+    from components.audio_events import wait_for_music_events, stop_waiting_for_music_events
+
+    engine = AudioEngine(crossfade_ms, mixer_settings)
+    engine.init()
+
+    def on_music_end():
+        # Обновляем флаг до отправки события, чтобы UI-процесс увидел актуальное состояние
+        block.busy = int(engine.is_busy())
+        events.send("music_end")
+
+    listener = threading.Thread(target=wait_for_music_events, args=(on_music_end,), daemon=True)
+    listener.start()
+
+    def play(song, data, volume=None):
+        engine.play(song, io.BytesIO(data) if data is not None else None, volume)
+        if volume is not None:
+            # Иначе опрос громкости вернул бы новой деке громкость прошлого трека
+            block.volume = volume
+        block.state = STATE_PLAYING
+        length = engine.track_length_ms()
+        block.length_ms = length if length is not None else -1
+        return length
+
+    def pause():
+        engine.pause()
+        block.state = STATE_PAUSED
+
+    def unpause():
+        engine.unpause()
+        block.state = STATE_PLAYING
+
+    def halt_decks():
+        engine.halt_decks()
+        if engine.uses_decks:
+            block.state = STATE_STOPPED
+
+    def unload():
+        engine.unload()
+        block.state = STATE_STOPPED
+
+    handlers = {
+        "play": play,
+        "prepare": engine.prepare,
+        "pause": pause,
+        "unpause": unpause,
+        "halt_decks": halt_decks,
+        "unload": unload,
+        "play_sound": engine.play_sound,
+        "pause_sounds": engine.pause_sounds,
+        "unpause_sounds": engine.unpause_sounds,
+    }
+
+    applied_volume = None
+    while True:
+        # Пока ничего не играет, процесс спит до следующей команды
+        timeout = VOLUME_POLL_INTERVAL if block.state == STATE_PLAYING else None
+        if commands.poll(timeout):
+            try:
+                name, args, reply = commands.recv()
+            except EOFError:
+                break
+            if name == "quit":
+                break
+            try:
+                result = handlers[name](*args)
+            except Exception as e:
+                print(f"ОШИБКА в процессе звука, команда {name}: {e}")
+                result = None
+            if reply:
+                commands.send(result)
+            applied_volume = None
+
+        if block.volume != applied_volume:
+            applied_volume = block.volume
+            engine.set_volume(applied_volume)
+        block.busy = int(engine.is_busy())
+        if not engine.uses_decks:
+            block.position_ms = pygame.mixer.music.get_pos()
+
+    stop_waiting_for_music_events()
+    listener.join(1)
+    engine.quit()
+
+
+class ProcessAudioEngine:
+    """Тот же интерфейс, что у AudioEngine, но pygame работает в дочернем процессе.
+
+    Громкость, состояние и позиция лежат в общей памяти (ControlBlock),
+    команды идут по pipe. Зависания UI не прерывают звук, а падение
+    декодера роняет только дочерний процесс - он перезапускается при
+    следующей команде.
+    """
+
+    def __init__(self, crossfade_ms=0, mixer_settings=None):
+        self.crossfade_ms = crossfade_ms
+        self.mixer_settings = mixer_settings or {}
+        self.on_music_end = None  # Вызывается из потока-читателя событий процесса звука
+        self.block = RawValue(ControlBlock)
+        self.block.volume = 1.0
+        self.lock = threading.Lock()
+        self.process = None
+        self.commands = None
+        self.events = None
+        self.length_ms = None
+
+    @property
+    def uses_decks(self):
+        return self.crossfade_ms > 0
+
+    @property
+    def volume(self):
+        return self.block.volume
+
+    def init(self):
+        with self.lock:
+            self._start()
+
+    def _start(self):
+        commands, child_commands = multiprocessing.Pipe()
+        events, child_events = multiprocessing.Pipe(duplex=False)
+        self.block.state = STATE_STOPPED
+        self.block.busy = 0
+        self.process = multiprocessing.Process(target=run_engine_process, name="FocusTimerAudio", daemon=True,
+                                               args=(child_commands, child_events, self.block, self.crossfade_ms,
+                                                     self.mixer_settings))
+        self.process.start()
+        self.commands = commands
+        self.events = events
+        threading.Thread(target=self._read_events, args=(events,), daemon=True).start()
+
+    def _read_events(self, events):
+        while True:
+            try:
+                event = events.recv()
+            except (EOFError, OSError):
+                # Процесс звука завершился или упал - музыка больше не играет
+                if events is self.events:
+                    self.block.busy = 0
+                    self.block.state = STATE_STOPPED
+                    if self.on_music_end:
+                        self.on_music_end()
+                return
+            if event == "music_end" and self.on_music_end:
+                self.on_music_end()
+
+    def _call(self, name, *args, reply=False):
+        with self.lock:
+            if self.process is None or not self.process.is_alive():
+                if self.process is not None:
+                    log_error(error=RuntimeError(f"код выхода {self.process.exitcode}"),
+                              method_prefix="ProcessAudioEngine: перезапуск процесса звука")
+                self._start()
+            try:
+                self.commands.send((name, args, reply))
+                return self.commands.recv() if reply else None
+            except (EOFError, OSError) as e:
+                log_error(error=e, method_prefix=f"ProcessAudioEngine.{name}")
+                return None
+
+    def play(self, song, buffer=None, volume=None):
+        data = buffer.getvalue() if buffer is not None else None
+        self.length_ms = self._call("play", song, data, volume, reply=True)
+
+    def prepare(self, song):
+        if self.uses_decks and song:
+            self._call("prepare", song)
+
+    def track_length_ms(self):
+        return self.length_ms
+
+    def pause(self):
+        self._call("pause")
+
+    def unpause(self):
+        self._call("unpause")
+
+    def halt_decks(self):
+        self._call("halt_decks")
+
+    def unload(self):
+        self.length_ms = None
+        self._call("unload")
+
+    def play_sound(self, name):
+        self._call("play_sound", name)
+
+    def pause_sounds(self):
+        self._call("pause_sounds")
+
+    def unpause_sounds(self):
+        self._call("unpause_sounds")
+
+    def set_volume(self, value):
+        # Без pipe и системных вызовов: процесс звука сам подхватит значение
+        self.block.volume = value
+
+    def is_busy(self):
+        return bool(self.block.busy)
+
+    def position_ms(self):
+        return self.block.position_ms
+
+    def quit(self):
+        with self.lock:
+            if self.process is None:
+                return
+            events, self.events = self.events, None
+            try:
+                self.commands.send(("quit", (), False))
+            except OSError:
+                pass
+            self.process.join(2)
+            if self.process.is_alive():
+                self.process.terminate()
+            events.close()
+            self.process = None
@@ -0,0 +1,81 @@
+import math
+import threading
+import time
+
+# Формы кривой нарастания громкости: x от 0 до 1 -> усиление от 0 до 1
+FADE_CURVES = {
+    "linear": lambda x: x,
+    "equal_power": lambda x: math.sin(x * math.pi / 2),
+    "exponential": lambda x: (math.pow(1000, x) - 1) / 999,  # 60 дБ динамики, как слышит ухо
+}
+
+
+def fade_gain(curve, start, end, progress):
+    """Громкость в точке progress (0..1) фейда от start до end"""
+    shape = FADE_CURVES.get(curve, FADE_CURVES["linear"])
+    progress = max(0.0, min(1.0, progress))
+    if end >= start:
+        return start + (end - start) * shape(progress)
+    # Затухание - зеркальная кривая нарастания
+    return end + (start - end) * shape(1.0 - progress)
+
+
+class VolumeFader:
+    """Фейд громкости в отдельном потоке по реальному времени.
+
+    Громкость считается от time.monotonic(), поэтому фейд длится ровно
+    заданное время, даже если поток просыпается с опозданием. GUI-поток
+    в шагах фейда не участвует.
+    """
+
+    STEP = 0.02  # Шаг обновления громкости в секундах
+
+    def __init__(self, apply_volume, on_finished=None, curve="equal_power"):
+        self.apply_volume = apply_volume  # Установка громкости (вызывается из потока фейдера)
+        self.on_finished = on_finished  # on_finished(номер фейда) по окончании фейда
+        self.curve = curve
+        self.condition = threading.Condition()
+        self.fade = None  # (start, end, начало, длительность, номер)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="VolumeFader", daemon=True)
+        self.thread.start()
+
+    def start(self, start_volume, end_volume, duration_ms, fade_id=0):
+        with self.condition:
+            self.fade = (start_volume, end_volume, time.monotonic(), max(duration_ms, 1) / 1000, fade_id)
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.fade = None
+
+    def shutdown(self):
+        with self.condition:
+            self.running = False
+            self.fade = None
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                # Пока фейда нет - поток спит и не просыпается
+                while self.running and self.fade is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                start_volume, end_volume, started, duration, fade_id = self.fade
+
+            progress = (time.monotonic() - started) / duration
+            self.apply_volume(fade_gain(self.curve, start_volume, end_volume, progress))
+
+            if progress >= 1.0:
+                with self.condition:
+                    finished = self.fade is not None and self.fade[4] == fade_id and self.fade[2] == started
+                    if finished:
+                        self.fade = None
+                if finished and self.on_finished:
+                    self.on_finished(fade_id)
+                continue
+
+            with self.condition:
+                self.condition.wait(self.STEP)
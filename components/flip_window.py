@@ -115,9 +115,15 @@ class MarqueeLabel(QLabel):
 
 
 class FlipCard(QWidget):
-    def __init__(self,font_color):
+    def __init__(self,font_color, metadata=None, playlist=None):
         super().__init__()
         self.current_label = None
+        self.playlist = playlist  # Плейлист плеера: по id трека отдает путь
+        self.metadata = metadata  # Сервис тегов: вместо имени файла показываем название трека
+        self.current_song = None
+        self.displayed_songs = set()
+        if self.metadata is not None:
+            self.metadata.metadata_ready.connect(self.on_metadata_ready)
         self.setAttribute(Qt.WA_StyledBackground, True)
         self.back_widget = None
         self.front_widget = None
@@ -174,17 +180,35 @@ class FlipCard(QWidget):
         self.history_layout.setAlignment(Qt.AlignTop)
         self.history_layout.setSpacing(10)
         self.history_layout.setContentsMargins(5, 40, 15, 20)
-        self.update_song_history("тут", self.song_list)
+        self.show_songs("тут", self.song_list)
         self.history_layout.addStretch()
 
-    def update_song_history(self, current_song, song_list):
+    def update_song_history(self, generation, current_id, track_ids):
+        """Плеер присылает только id треков, пути собираем здесь по запросу"""
+        paths = self.playlist.resolve(generation, [current_id, *track_ids])
+        if paths is None:
+            # id из уже очищенного плейлиста (сменили папку с музыкой)
+            return
+        self.show_songs(paths[0], paths[1:])
+
+    def show_songs(self, current_song, song_list):
         while self.history_layout.count():
             child = self.history_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
 
+        self.current_song = current_song
+        self.song_list = song_list
+        self.displayed_songs = set(song_list)
+        if self.metadata is not None:
+            # Теги читаются в фоне, пока показываем имена файлов
+            self.metadata.request(song_list)
+
         for i, song in enumerate(song_list):
-            song_name = "  "+str(os.path.basename(song).replace(".mp3", "").replace(".wav", ""))
+            if self.metadata is not None:
+                song_name = "  " + self.metadata.display_name(song)
+            else:
+                song_name = "  "+str(os.path.basename(song).replace(".mp3", "").replace(".wav", ""))
 
             song_text = QLabel(song_name)
             if song==current_song:
@@ -213,6 +237,10 @@ class FlipCard(QWidget):
                                     """)
             self.history_layout.addWidget(song_text)
 
+    def on_metadata_ready(self, path, tags):
+        if path in self.displayed_songs and tags.get("title"):
+            self.show_songs(self.current_song, self.song_list)
+
     def set_font_color(self, font_color):
         self.font_color=font_color
         self.current_label.setStyleSheet(f"""
@@ -0,0 +1,68 @@
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from components.utils import log_error
+
+
+class MusicFolderWatcher(QObject):
+    """Следит за деревом папки с музыкой и применяет изменения без полного пересканирования"""
+    files_added = pyqtSignal(list)
+    files_removed = pyqtSignal(list)
+
+    DEBOUNCE_MS = 1000  # Пачка событий (например, копирование альбома) объединяется в одно обновление
+
+    def __init__(self, library):
+        super().__init__()
+        self.library = library
+        self.root = ""
+        self.changed_dirs = set()  # Папки, изменившиеся с последнего обновления
+
+        self.watcher = QFileSystemWatcher()
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self.debounce_timer = QTimer()
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.apply_changes)
+
+    def watch(self, root):
+        self.stop()
+        self.root = root
+        directories = self.library.directories(root)
+        if directories:
+            self.watcher.addPaths(directories)
+
+    def stop(self):
+        self.debounce_timer.stop()
+        self.changed_dirs.clear()
+        watched = self.watcher.directories()
+        if watched:
+            self.watcher.removePaths(watched)
+        self.root = ""
+
+    def on_directory_changed(self, directory):
+        self.changed_dirs.add(directory)
+        # Каждое новое событие откладывает обновление
+        self.debounce_timer.start()
+
+    def apply_changes(self):
+        if not self.root or not self.changed_dirs:
+            return
+        directories = self.changed_dirs
+        self.changed_dirs = set()
+        try:
+            added, removed, new_dirs, removed_dirs = self.library.refresh(self.root, directories)
+        except Exception as e:
+            log_error(self.root, e, "MusicFolderWatcher.apply_changes")
+            return
+
+        if removed_dirs:
+            watched = set(self.watcher.directories())
+            stale = [d for d in removed_dirs if d in watched]
+            if stale:
+                self.watcher.removePaths(stale)
+        if new_dirs:
+            self.watcher.addPaths(new_dirs)
+        if removed:
+            self.files_removed.emit(removed)
+        if added:
+            self.files_added.emit(added)
@@ -0,0 +1,96 @@
+from array import array
+
+
+class PlaybackHistory:
+    """История воспроизведения фиксированной глубины.
+
+    Хранит не пути, а id треков из строковой таблицы плейлиста в кольцевом
+    буфере array('I'). Переход назад/вперед и добавление - O(1), самые
+    старые записи вытесняются, поэтому память не растет со временем работы.
+    """
+
+    def __init__(self, depth=500):
+        self.depth = max(1, int(depth))
+        self.ring = array('I', bytes(4 * self.depth))  # Кольцевой буфер id треков
+        self.start = 0  # Позиция самой старой записи в ring
+        self.size = 0  # Количество записей
+        self.pointer = -1  # Индекс текущего трека (0 - самая старая запись)
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self.ring[(self.start + index) % self.depth]
+
+    def __iter__(self):
+        return (self[i] for i in range(self.size))
+
+    def current(self):
+        return self[self.pointer] if 0 <= self.pointer < self.size else None
+
+    def has_next(self):
+        return self.pointer < self.size - 1
+
+    def peek_next(self):
+        return self[self.pointer + 1] if self.has_next() else None
+
+    def forward(self):
+        """Переход к следующей записи истории"""
+        if not self.has_next():
+            return None
+        self.pointer += 1
+        return self[self.pointer]
+
+    def back(self):
+        """Переход к предыдущей записи истории"""
+        if self.pointer <= 0:
+            return None
+        self.pointer -= 1
+        return self[self.pointer]
+
+    def append(self, track_id):
+        """Добавляет трек в конец истории и делает его текущим"""
+        if self.size == self.depth:
+            # Вытесняем самую старую запись
+            self.start = (self.start + 1) % self.depth
+            self.size -= 1
+        self.ring[(self.start + self.size) % self.depth] = track_id
+        self.size += 1
+        self.pointer = self.size - 1
+
+    def remove_at(self, index):
+        """Удаляет запись по индексу; указатель сдвигается, если запись была до него или на нем"""
+        if not 0 <= index < self.size:
+            return
+        for i in range(index, self.size - 1):
+            self.ring[(self.start + i) % self.depth] = self[i + 1]
+        self.size -= 1
+        if index <= self.pointer:
+            self.pointer = max(self.pointer - 1, 0 if self.size else -1)
+
+    def remove_ids(self, track_ids):
+        """Удаляет все записи с этими id; указатель остается на ближайшей предыдущей записи"""
+        kept = array('I')
+        pointer = -1
+        for i, track_id in enumerate(self):
+            if track_id in track_ids:
+                continue
+            if i <= self.pointer:
+                pointer = len(kept)
+            kept.append(track_id)
+        if len(kept) == self.size:
+            return
+        self.ring[:len(kept)] = kept
+        self.start = 0
+        self.size = len(kept)
+        self.pointer = pointer
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+        self.pointer = -1
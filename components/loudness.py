@@ -0,0 +1,170 @@
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+
+from components.music_library import LIBRARY_FILE_NAME
+from components.utils import get_app_data_dir, log_error
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TARGET_LOUDNESS = -18.0  # Опорная громкость ReplayGain 2.0, LUFS
+MIN_GAIN = 0.1
+MAX_GAIN = 2.0
+BLOCK_SECONDS = 0.4  # Длина блока измерения, как в BS.1770
+CHUNK_BLOCKS = 64  # Сколько блоков переводится во float за раз
+ANALYSIS_FREQUENCY = 22050  # Частота микшера процесса анализа: декодированный трек вдвое меньше
+
+
+def _init_analysis_process():
+    """Процесс анализа: низкий приоритет и звук без устройства вывода"""
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    try:
+        process = psutil.Process()
+        if sys.platform == "win32":
+            process.nice(psutil.IDLE_PRIORITY_CLASS)
+        else:
+            process.nice(19)
+    except Exception:
+        pass
+
+
+def measure_loudness(path):
+    """Интегральная громкость трека в LUFS (выполняется в процессе анализа).
+
+    Блоки по 400 мс с абсолютным (-70) и относительным (-10) порогом, как
+    в BS.1770, но без K-фильтра - для выравнивания треков этого достаточно.
+    Сэмплы читаются прямо из буфера Sound и переводятся во float порциями
+    по CHUNK_BLOCKS блоков, копии всего трека не создаются.
+    """
+    import pygame
+
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(frequency=ANALYSIS_FREQUENCY)
+    frequency, size, channels = pygame.mixer.get_init()
+    sound = pygame.mixer.Sound(path)
+    samples = pygame.sndarray.samples(sound)  # Вид на буфер Sound, без копирования
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+    scale = float(2 ** (abs(size) - 1))
+
+    block = int(frequency * BLOCK_SECONDS)
+    blocks = len(samples) // block
+    if blocks == 0:
+        return None
+    power = np.empty(blocks)
+    for first in range(0, blocks, CHUNK_BLOCKS):
+        last = min(blocks, first + CHUNK_BLOCKS)
+        chunk = samples[first * block:last * block].astype(np.float32)
+        chunk /= scale
+        chunk *= chunk
+        power[first:last] = chunk.reshape(last - first, block, -1).mean(axis=1).sum(axis=1)
+    loudness = -0.691 + 10 * np.log10(np.maximum(power, 1e-12))
+
+    gated = power[loudness > -70.0]
+    if not len(gated):
+        return None
+    relative_gate = -0.691 + 10 * math.log10(gated.mean()) - 10.0
+    gated = power[(loudness > -70.0) & (loudness > relative_gate)]
+    return float(-0.691 + 10 * math.log10(gated.mean()))
+
+
+class LoudnessAnalyzer:
+    """Фоновый анализ громкости треков с сохранением результата в базе библиотеки.
+
+    Файлы анализируются по одному в отдельном процессе с минимальным
+    приоритетом, с паузой между файлами. Уже измеренные треки (по пути,
+    mtime и размеру) пропускаются, поэтому анализ продолжается с места
+    остановки после перезапуска.
+    """
+
+    THROTTLE_SECONDS = 1.0  # Пауза между файлами
+
+    def __init__(self, db_path=None):
+        self.enabled = np is not None
+        self.db_path = str(db_path or get_app_data_dir() / LIBRARY_FILE_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS loudness (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                lufs REAL
+            )""")
+        self.connection.commit()
+        self.queue = queue.Queue()
+        self.queued = set()
+        self.stopped = threading.Event()
+        self.pool = None
+        self.thread = None
+
+    def analyze(self, paths):
+        """Добавляет треки в очередь анализа"""
+        if not self.enabled:
+            return
+        with self.lock:
+            paths = [path for path in paths if path not in self.queued]
+            self.queued.update(paths)
+        for path in paths:
+            self.queue.put(path)
+        if self.thread is None:
+            self.pool = ProcessPoolExecutor(max_workers=1, initializer=_init_analysis_process)
+            self.thread = threading.Thread(target=self._run, name="LoudnessAnalyzer", daemon=True)
+            self.thread.start()
+
+    def gain(self, path):
+        """Множитель громкости для трека (1.0, если трек еще не измерен)"""
+        with self.lock:
+            row = self.connection.execute("SELECT lufs FROM loudness WHERE path = ?", (path,)).fetchone()
+        if row is None or row[0] is None:
+            return 1.0
+        return max(MIN_GAIN, min(MAX_GAIN, math.pow(10, (TARGET_LOUDNESS - row[0]) / 20)))
+
+    def _is_measured(self, path, stat):
+        with self.lock:
+            row = self.connection.execute("SELECT mtime, size FROM loudness WHERE path = ?", (path,)).fetchone()
+        return row is not None and row[0] == stat.st_mtime and row[1] == stat.st_size
+
+    def _run(self):
+        while not self.stopped.is_set():
+            path = self.queue.get()
+            if path is None:
+                break
+            with self.lock:
+                self.queued.discard(path)
+            try:
+                stat = os.stat(path)
+                if self._is_measured(path, stat):
+                    continue
+                lufs = self.pool.submit(measure_loudness, path).result()
+            except Exception as e:
+                if self.stopped.is_set():
+                    break
+                log_error(error=e, method_prefix="LoudnessAnalyzer", song=path)
+                continue
+
+            with self.lock:
+                self.connection.execute("INSERT OR REPLACE INTO loudness (path, mtime, size, lufs) VALUES (?, ?, ?, ?)",
+                                        (path, stat.st_mtime, stat.st_size, lufs))
+                self.connection.commit()
+            # Не даем анализу конкурировать с воспроизведением
+            self.stopped.wait(self.THROTTLE_SECONDS)
+
+    def close(self):
+        self.stopped.set()
+        self.queue.put(None)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.thread is not None:
+            self.thread.join(1)
+        with self.lock:
+            self.connection.close()
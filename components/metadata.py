@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from components.music_library import LIBRARY_FILE_NAME
+from components.utils import get_app_data_dir
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+
+def song_title_from_path(path):
+    return os.path.basename(path).replace(".mp3", "").replace(".wav", "")
+
+
+def read_tags(path):
+    """Читает теги файла: title, artist, album, duration (секунды)"""
+    tags = {"title": "", "artist": "", "album": "", "duration": 0.0}
+    if mutagen is None:
+        return tags
+    audio = mutagen.File(path, easy=True)
+    if audio is None:
+        return tags
+    for key in ("title", "artist", "album"):
+        values = audio.get(key) if audio.tags is not None else None
+        if values:
+            tags[key] = str(values[0])
+    if getattr(audio, "info", None) is not None:
+        tags["duration"] = float(getattr(audio.info, "length", 0.0) or 0.0)
+    return tags
+
+
+class MetadataService(QObject):
+    """Ленивое чтение тегов в фоне с кэшем на диске.
+
+    Теги читаются только для треков, которые сейчас покажут или сыграют.
+    Кэш лежит в базе библиотеки и привязан к пути, mtime и размеру файла.
+    """
+    metadata_ready = pyqtSignal(str, dict)  # Путь, теги
+
+    def __init__(self, db_path=None):
+        super().__init__()
+        self.db_path = str(db_path or get_app_data_dir() / LIBRARY_FILE_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS tags (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                title TEXT,
+                artist TEXT,
+                album TEXT,
+                duration REAL
+            )""")
+        self.connection.commit()
+        self.pool = ThreadPoolExecutor(max_workers=2)
+        self.cache = {}  # Путь -> теги, уже прочитанные в этой сессии
+        self.pending = set()  # Пути, которые читаются сейчас
+
+    def get(self, path):
+        """Теги из памяти или None. Никогда не ждет диск."""
+        return self.cache.get(path)
+
+    def display_name(self, path):
+        tags = self.cache.get(path)
+        if tags and tags["title"]:
+            return f"{tags['artist']} - {tags['title']}" if tags["artist"] else tags["title"]
+        return song_title_from_path(path)
+
+    def request(self, paths):
+        """Ставит в очередь чтение тегов для треков, которых еще нет в памяти"""
+        with self.lock:
+            paths = [path for path in paths if path and path not in self.cache and path not in self.pending]
+            self.pending.update(paths)
+        for path in paths:
+            self.pool.submit(self._load, path)
+
+    def _load(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self.lock:
+                self.pending.discard(path)
+            return
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT mtime, size, title, artist, album, duration FROM tags WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            tags = {"title": row[2], "artist": row[3], "album": row[4], "duration": row[5]}
+        else:
+            try:
+                tags = read_tags(path)
+            except Exception as e:
+                print(f"Ошибка чтения тегов {path}: {e}")
+                tags = {"title": "", "artist": "", "album": "", "duration": 0.0}
+            with self.lock:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO tags (path, mtime, size, title, artist, album, duration) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, stat.st_mtime, stat.st_size, tags["title"], tags["artist"], tags["album"],
+                     tags["duration"]))
+                self.connection.commit()
+
+        with self.lock:
+            self.cache[path] = tags
+            self.pending.discard(path)
+        self.metadata_ready.emit(path, tags)
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import threading
+
+from components.scanner import AudioScanner
+from components.utils import get_app_data_dir
+
+LIBRARY_FILE_NAME = "library.db"
+
+
+class MusicLibrary:
+    """Постоянный индекс музыкальной библиотеки в SQLite.
+
+    Для каждой папки хранится её mtime и список аудиофайлов. Повторное
+    сканирование перечитывает только те папки, mtime которых изменился.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or get_app_data_dir() / LIBRARY_FILE_NAME)
+        self.scanner = AudioScanner()
+        self.lock = threading.Lock()  # Соединение используется из разных потоков
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS directories (
+                root TEXT NOT NULL,
+                path TEXT NOT NULL,
+                parent TEXT,
+                mtime REAL NOT NULL,
+                PRIMARY KEY (root, path)
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                root TEXT NOT NULL,
+                directory TEXT NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (root, directory, name)
+            );
+        """)
+        self.connection.commit()
+
+    def load(self, root):
+        """Возвращает плейлист из индекса без обращения к диску"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT directory, name FROM files WHERE root = ? ORDER BY directory, name", (root,)).fetchall()
+        return [os.path.join(directory, name) for directory, name in rows]
+
+    def is_indexed(self, root):
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM directories WHERE root = ? LIMIT 1", (root,)).fetchone()
+        return row is not None
+
+    def scan(self, root, on_files=None):
+        """Инкрементальное сканирование: заходим только в изменившиеся папки.
+
+        on_files(список путей) вызывается для каждой перечитанной папки, пока
+        обход еще идет - по нему можно наполнять плейлист на лету.
+        """
+        if not root or not os.path.isdir(root):
+            return []
+
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT path, parent, mtime FROM directories WHERE root = ?", (root,)).fetchall()
+        children = {}
+        for path, parent, mtime in rows:
+            children.setdefault(parent, []).append(path)
+        known = {path: (mtime, children.get(path, [])) for path, parent, mtime in rows}
+
+        changed = {}  # Папка -> (mtime, родитель, файлы)
+
+        def collect(directory, parent, mtime, files):
+            if files is not None:
+                changed[directory] = (mtime, parent, files)
+                if on_files and files:
+                    on_files([os.path.join(directory, name) for name in files])
+
+        visited = self.scanner.scan(root, known, collect)
+        self._save(root, changed, set(known) - visited)
+        return self.load(root)
+
+    def directories(self, root):
+        with self.lock:
+            rows = self.connection.execute("SELECT path FROM directories WHERE root = ?", (root,)).fetchall()
+        return [path for (path,) in rows]
+
+    def refresh(self, root, directories):
+        """Перечитывает только указанные папки и появившиеся в них подпапки.
+
+        Возвращает (добавленные файлы, удаленные файлы, новые папки, удаленные папки).
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT path, parent, mtime FROM directories WHERE root = ?", (root,)).fetchall()
+        children = {}
+        for path, parent, mtime in rows:
+            children.setdefault(parent, []).append(path)
+        known = {path: (mtime, children.get(path, [])) for path, parent, mtime in rows}
+
+        changed = {}
+
+        def collect(directory, parent, mtime, files):
+            if files is not None:
+                changed[directory] = (mtime, None if directory == root else os.path.dirname(directory), files)
+
+        visited = set()
+        for directory in directories:
+            if directory in visited or directory not in known and os.path.dirname(directory) not in known:
+                continue
+            # Сама папка перечитывается всегда, неизменившиеся подпапки - нет
+            known_for_scan = dict(known)
+            known_for_scan.pop(directory, None)
+            visited |= self.scanner.scan(directory, known_for_scan, collect, descend_unchanged=False)
+
+        # Пропавшие папки вместе со всеми вложенными
+        removed_dirs = set()
+        stack = [d for d in directories if d in known and d not in visited]
+        for directory in changed:
+            stack.extend(child for child in children.get(directory, []) if child not in visited)
+        while stack:
+            directory = stack.pop()
+            if directory not in removed_dirs:
+                removed_dirs.add(directory)
+                stack.extend(children.get(directory, []))
+
+        added, removed = [], []
+        with self.lock:
+            for directory in set(changed) | removed_dirs:
+                before = {name for (name,) in self.connection.execute(
+                    "SELECT name FROM files WHERE root = ? AND directory = ?", (root, directory))}
+                after = set(changed[directory][2]) if directory in changed else set()
+                added.extend(os.path.join(directory, name) for name in after - before)
+                removed.extend(os.path.join(directory, name) for name in before - after)
+
+        self._save(root, changed, removed_dirs)
+        return added, removed, [d for d in changed if d not in known], list(removed_dirs)
+
+    def _save(self, root, changed, removed):
+        with self.lock:
+            cursor = self.connection.cursor()
+            for directory in removed:
+                cursor.execute("DELETE FROM directories WHERE root = ? AND path = ?", (root, directory))
+                cursor.execute("DELETE FROM files WHERE root = ? AND directory = ?", (root, directory))
+            for directory, (mtime, parent, files) in changed.items():
+                cursor.execute("INSERT OR REPLACE INTO directories (root, path, parent, mtime) VALUES (?, ?, ?, ?)",
+                               (root, directory, parent, mtime))
+                cursor.execute("DELETE FROM files WHERE root = ? AND directory = ?", (root, directory))
+                cursor.executemany("INSERT INTO files (root, directory, name) VALUES (?, ?, ?)",
+                                   [(root, directory, name) for name in files])
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
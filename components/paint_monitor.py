@@ -0,0 +1,30 @@
+import time
+
+
+class PaintRateMonitor:
+    """Счетчик перерисовок окна.
+
+    Нужен для проверки, что окно не перерисовывается без причины: на паузе
+    и в трее частота должна быть около нуля.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0  # Перерисовок с последнего отчета
+        self.total = 0  # Перерисовок за все время
+        self.since = time.monotonic()
+
+    def record(self):
+        self.count += 1
+        self.total += 1
+
+    def rate(self):
+        """Перерисовок в секунду с последнего отчета"""
+        elapsed = time.monotonic() - self.since
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        """Печатает частоту перерисовок и начинает новый интервал"""
+        print(f"{self.name}: {self.rate():.2f} перерисовок/с (всего {self.total})")
+        self.count = 0
+        self.since = time.monotonic()
@@ -1,43 +1,205 @@
+import functools
 import os
-import random
-from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
 
-import pygame.mixer
 from PyQt5.QtCore import QThread, QTimer, pyqtSignal
-from PyQt5.QtCore import QUrl
-from PyQt5.QtMultimedia import QMediaContent
-from PyQt5.QtMultimedia import QMediaPlayer
 
-from components.utils import get_resource_path, check_exists, log_error
+from components.audio_engine import AudioEngine
+from components.audio_events import MusicEndWatcher
+from components.audio_process import ProcessAudioEngine
+from components.fader import VolumeFader
+from components.folder_watcher import MusicFolderWatcher
+from components.history import PlaybackHistory
+from components.loudness import LoudnessAnalyzer
+from components.metadata import MetadataService
+from components.music_library import MusicLibrary
+from components.playlist import Playlist
+from components.prefetch import TrackPrefetcher
+from components.shuffle import ShuffleBag
+from components.trash import TrashQueue
+from components.validator import PlaylistValidator
+from components.utils import log_error
+
+
+def audio_command(method):
+    """Метод плеера, который выполняется только в потоке плеера.
+
+    Вызов из любого другого потока (GUI, фейдер, сигналы) ставится в очередь
+    команд и сразу возвращает управление.
+    """
+    max_args = method.__code__.co_argcount - 1
+
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        # Лишние аргументы сигналов (например, checked у QAction) отбрасываем
+        args = args[:max_args]
+        if threading.get_ident() == self.worker_ident:
+            return method(self, *args)
+        self.commands.put((method, args))
+
+    return wrapper
+
+
+class LibraryScanWorker(QThread):
+    """Фоновое сканирование папки с музыкой с выдачей плейлиста порциями"""
+    files_found = pyqtSignal(list)  # Новая порция путей
+    files_removed = pyqtSignal(list)  # Пути, которых больше нет на диске
+    scan_finished = pyqtSignal(int)  # Сканирование завершено, всего треков
+
+    BATCH_SIZE = 200  # Максимальный размер порции
+    BATCH_INTERVAL = 0.2  # Максимальная задержка порции в секундах
+
+    def __init__(self, library, root):
+        super().__init__()
+        self.library = library
+        self.root = root
+        self.stopped = False
+        self.batch = []
+        self.last_flush = 0.0
+        self.emitted = set()
+
+    def stop(self):
+        self.stopped = True
+
+    def run(self):
+        try:
+            # Сначала отдаем то, что уже есть в индексе - это миллисекунды
+            indexed = self.library.load(self.root)
+            self.emitted.update(indexed)
+            for i in range(0, len(indexed), self.BATCH_SIZE):
+                if self.stopped:
+                    return
+                self.files_found.emit(indexed[i:i + self.BATCH_SIZE])
+
+            current = self.library.scan(self.root, self.add_files)
+        except sqlite3.Error as e:
+            log_error(self.root, e, "LibraryScanWorker")
+            current = self.library.scanner.find_audio_files(self.root)
+            self.add_files(current)
+        self.flush()
+
+        if self.stopped:
+            return
+        removed = list(self.emitted.difference(current))
+        if removed:
+            self.files_removed.emit(removed)
+        self.scan_finished.emit(len(current))
+
+    def add_files(self, paths):
+        self.batch.extend(path for path in paths if path not in self.emitted)
+        self.emitted.update(paths)
+        # Первую порцию отдаем сразу, чтобы воспроизведение началось как можно раньше
+        if not self.last_flush or len(self.batch) >= self.BATCH_SIZE \
+                or time.monotonic() - self.last_flush >= self.BATCH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if self.batch and not self.stopped:
+            self.files_found.emit(self.batch)
+            self.batch = []
+            self.last_flush = time.monotonic()
 
 
 class AudioPlayerThread(QThread):
-    update_song_history = pyqtSignal(str, list)
+    VALIDATION_INTERVAL = 10 * 60 * 1000  # Период фоновой проверки плейлиста, мс
 
-    def __init__(self, volume):
+    # Поколение плейлиста, id текущего трека, array('I') id окна вокруг него
+    update_song_history = pyqtSignal(int, int, object)
+    watch_requested = pyqtSignal(str)  # Запустить отслеживание папки (QFileSystemWatcher живет в GUI-потоке)
+    unwatch_requested = pyqtSignal()  # Остановить отслеживание папки
+
+    def __init__(self, volume, prefetch_memory_mb=64, crossfade_ms=0, fade_curve="equal_power", audio_process=False,
+                 normalize_loudness=True, history_depth=500, mixer_settings=None):
         super().__init__()
-        self.pointer_of_song_in_history = -1  # Указатель индекса текущего трека в истории
+        self.commands = queue.Queue()  # Очередь команд для потока плеера
+        self.worker_ident = None  # Идентификатор потока плеера, появляется при запуске
         self.is_first_play = True  # Флаг первого воспроизведения
         self.random = True  # Флаг случайного воспроизведения
         self.path_to_music = ""  # Путь к дериктории с музыкой
         self.play_button_on = False  # Флаг воспроизведения главной в данный момент
 
         self.CURRENT_VOLUME = volume  # Громкость
+        self.normalize_loudness = normalize_loudness  # Флаг выравнивания громкости треков
+        self.track_gain = 1.0  # Поправка громкости текущего трека
         self.off = False  # Флаг тишины основной музыки
         self.current_song = None  # Индекс текущего трека
-        self.playlist = []  # Список файлов для воспроизведения
-        self.history = []  # Список файлов, которые были проиграны
-
-        self.fade_timer = QTimer()  # Таймер плавного изменения громкости
-        self.fade_timer.timeout.connect(self._update_fade)
+        self.playlist = Playlist()  # Треки для воспроизведения (таблицы папок и имен, id треков)
+        self.history = PlaybackHistory(history_depth)  # id проигранных треков, ограниченной глубины
+        self.shuffle = ShuffleBag()  # Случайный порядок id треков без повторов
+        self.prefetcher = TrackPrefetcher(prefetch_memory_mb)  # Чтение следующего трека в память заранее
+        self.current_buffer = None  # Буфер текущего трека, pygame читает из него во время игры
+        # Вывод звука: один поток или две деки с кроссфейдом, по желанию - в отдельном процессе
+        self.audio_process = audio_process
+        engine_class = ProcessAudioEngine if audio_process else AudioEngine
+        self.engine = engine_class(crossfade_ms, mixer_settings)
+
+        self.crossfade_deadline = None  # Момент (time.monotonic) начала кроссфейда в конце трека
+        self.crossfade_remaining = None  # Сколько секунд оставалось до кроссфейда в момент паузы
+        self.library = MusicLibrary()  # Индекс музыкальной библиотеки на диске
+        self.metadata = MetadataService()  # Теги треков, читаются лениво в фоне
+        self.loudness = LoudnessAnalyzer()  # Измерение громкости треков в фоновом процессе
+        self.scan_worker = None  # Фоновое сканирование папки с музыкой
+        self.stopped_scan_workers = []  # Остановленные, но еще не завершившиеся сканирования
+        self.waiting_for_tracks = False  # Флаг ожидания первой порции треков
+        self.watch_folder = True  # Флаг отслеживания изменений в папке с музыкой
+        self.folder_watcher = MusicFolderWatcher(self.library)
+        self.folder_watcher.files_added.connect(self.add_songs)
+        self.folder_watcher.files_removed.connect(self.remove_songs)
+        self.watch_requested.connect(self.folder_watcher.watch)
+        self.unwatch_requested.connect(self.folder_watcher.stop)
+        # Пропавшие с диска файлы ищутся в фоне, а не при переключении трека
+        self.validator = PlaylistValidator(self.remove_songs, self.on_validation_finished)
+        self.validation_timer = QTimer()
+        self.validation_timer.setInterval(self.VALIDATION_INTERVAL)
+        self.validation_timer.timeout.connect(self.start_validation)
+        self.validation_timer.start()
+        # Удаленные треки сначала лежат в корзине, удаление можно отменить
+        self.trash = TrashQueue()
+        self.trash.restored.connect(self.add_songs)
+
+        self.fade_id = 0  # Номер текущего фейда
+        self.custom_callback = None  # Действие по окончании текущего фейда
+        self.fader = VolumeFader(self.engine.set_volume, self._on_fade_finished, fade_curve)  # Плавное изменение громкости
+
+        self.music_end_watcher = MusicEndWatcher()  # Поток отслеживания конца трека
+        if audio_process:
+            # События конца трека приходят из процесса звука
+            self.engine.on_music_end = self.check_music_end
+        else:
+            self.music_end_watcher.music_ended.connect(self.check_music_end)
+            self.music_end_watcher.start()
 
-        self.check_timer = QTimer()  # Таймер отслеживания конца трека
-        self.check_timer.timeout.connect(self.check_music_end)
-        self.check_timer.start(500)  # Проверка каждые 500 мс
+    def run(self):
+        """Поток плеера: владеет pygame и выполняет команды из очереди"""
+        self.worker_ident = threading.get_ident()
+        self.engine.init()
+        self.engine.set_volume(self.track_volume())
+
+        while True:
+            timeout = None
+            if self.crossfade_deadline is not None:
+                timeout = max(0.0, self.crossfade_deadline - time.monotonic())
+            try:
+                method, args = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                self.crossfade_deadline = None
+                self.on_crossfade_due()
+                continue
+            if method is None:
+                break
+            try:
+                method(self, *args)
+            except Exception as e:
+                log_error(self.path_to_music, e, method.__name__, self.current_song)
+                print(f"ОШИБКА В {method.__name__}, ПЕСНЯ: ", self.current_song, e)
 
-        self.alarm_sound_player = QMediaPlayer()  # Плеер основной музыки
+        self.engine.quit()
 
     # ГЛАВНЫЙ МЕТОД PAUSE/PLAY
+    @audio_command
     def switch_play_pause(self,is_playing):
         self.play_button_on = is_playing
         if not self.off:
@@ -48,187 +210,332 @@ class AudioPlayerThread(QThread):
             else:
                 if self.play_button_on:
                     self.play_button_on = False
-                    self._fade_volume(self.CURRENT_VOLUME, 0.0, pygame.mixer.music.pause)
+                    self._fade_volume(self.track_volume(), 0.0, self.pause_output)
                 else:
                     self.play_button_on = True
-                    pygame.mixer.music.unpause()
-                    self._fade_volume(0.0, self.CURRENT_VOLUME)
+                    self.unpause_output()
+                    self._fade_volume(0.0, self.track_volume())
         else:
             self.play_button_on = not is_playing
 
 
+    @audio_command
     def set_volume(self, value):
         if 0.0 <= value <= 1.0:
             self.CURRENT_VOLUME = value
             if not self.off:
-                pygame.mixer.music.set_volume(value)
+                self.engine.set_volume(self.track_volume())
+
+    def track_volume(self):
+        """Громкость текущего трека с учетом поправки на его громкость"""
+        return min(1.0, self.CURRENT_VOLUME * self.track_gain)
 
     def switch_random(self, state):
         self.random = True if state else False
 
+    def switch_watch_folder(self, state):
+        self.watch_folder = True if state else False
+        if self.watch_folder and self.playlist and self.path_to_music:
+            self.folder_watcher.watch(self.path_to_music)
+        elif not self.watch_folder:
+            self.folder_watcher.stop()
 
+
+    @audio_command
     def check_music_end(self):
-        # Проверяем, закончилось ли воспроизведение
-        if self.play_button_on and not pygame.mixer.music.get_busy():
+        # Событие конца приходит и при остановке/смене трека - проверяем, что музыка действительно закончилась
+        if self.play_button_on and not self.engine.is_busy():
             self.play_next_track()
 
-    def run(self):
-        pygame.mixer.init()
-        pygame.mixer.music.set_volume(self.CURRENT_VOLUME)
-        self.alarm_sound_player.setMedia(QMediaContent(QUrl.fromLocalFile(get_resource_path("music/alarm.wav"))))
-        self.alarm_sound_player.setVolume(11)
+    def on_crossfade_due(self):
+        # Текущий трек подходит к концу - начинаем следующий поверх него
+        if self.play_button_on and not self.off:
+            self.play_next_track()
+
+    def pause_output(self):
+        if self.crossfade_deadline is not None:
+            self.crossfade_remaining = self.crossfade_deadline - time.monotonic()
+            self.crossfade_deadline = None
+        self.engine.pause()
+
+    def unpause_output(self):
+        self.engine.unpause()
+        if self.crossfade_remaining is not None:
+            self.crossfade_deadline = time.monotonic() + self.crossfade_remaining
+            self.crossfade_remaining = None
 
+    def halt_output(self):
+        self.crossfade_deadline = None
+        self.crossfade_remaining = None
+        self.engine.halt_decks()
 
+    @audio_command
     def play_alarm(self):
-        self.alarm_sound_player.play()
+        # Сигнал заранее декодирован и играет на своем канале поверх фейда музыки
+        self.engine.play_sound("alarm")
 
+    @audio_command
     def pause_alarm(self):
         if self.play_button_on:
-            self.alarm_sound_player.pause()
+            self.engine.pause_sounds()
         else:
-            self.alarm_sound_player.play()
+            self.engine.unpause_sounds()
 
     def set_music_folder(self, track_path):
+        # Путь нужен сразу (например, для сохранения настроек), остальное делает поток плеера
         self.path_to_music = track_path
+        self.apply_music_folder()
+
+    @audio_command
+    def apply_music_folder(self):
         if self.play_button_on:
             self.stop_music()
-            pygame.mixer.music.unload()
-            self.playlist = []
-            self.history = []
+            self.engine.unload()
+            self.clear_playlist()
             self.play_music()
         else:
             self.is_first_play = True
             self.off = False
 
+    @audio_command
     def set_music_off(self):
-        self._fade_volume(self.CURRENT_VOLUME, 0.0, pygame.mixer.stop, 3000)
+        self._fade_volume(self.track_volume(), 0.0, self.halt_output, 3000)
         self.off = True
-        pygame.mixer.music.unload()
-        self.playlist = []
-        self.history = []
+        self.engine.unload()
+        self.clear_playlist()
 
 
+    @audio_command
     def stop_music(self, fade_duration=3000):
         self.play_button_on = False
-        self._fade_volume(self.CURRENT_VOLUME, 0.0, pygame.mixer.stop, fade_duration)
+        self._fade_volume(self.track_volume(), 0.0, self.halt_output, fade_duration)
         self.off = True
 
 
+    @audio_command
     def play_music(self):
         self.play_button_on = True
         self.off = False
         if not self.playlist and self.path_to_music:
-            self.playlist = self.find_audio_files_recursive(self.path_to_music)
-        if self.playlist:
+            # Плейлист наполняется в фоне, первый трек стартует с первой порцией
+            self.waiting_for_tracks = True
+            self.start_scan()
+        elif self.playlist:
             self.play_next_track()
 
+    def start_scan(self):
+        if self.scan_worker is not None and self.scan_worker.isRunning():
+            if self.scan_worker.root == self.path_to_music:
+                return
+        self.stop_scan()
+        self.scan_worker = LibraryScanWorker(self.library, self.path_to_music)
+        self.scan_worker.files_found.connect(self.on_files_found)
+        self.scan_worker.files_removed.connect(self.on_files_removed)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.start()
+
+    def on_files_found(self, paths):
+        if self.sender() is self.scan_worker:
+            self.add_songs(paths)
+
+    def on_files_removed(self, paths):
+        if self.sender() is self.scan_worker:
+            self.remove_songs(paths)
+
+    def on_scan_finished(self, count):
+        if self.sender() is self.scan_worker and self.watch_folder:
+            # Дальше изменения в папке подхватываются без полного пересканирования
+            self.watch_requested.emit(self.path_to_music)
+
+    @audio_command
+    def add_songs(self, paths):
+        self.shuffle.extend(self.playlist.extend(paths))
+        self.loudness.analyze(paths)
+        if self.waiting_for_tracks and self.play_button_on and not self.off:
+            self.waiting_for_tracks = False
+            self.play_next_track()
+
+    @audio_command
+    def remove_songs(self, paths):
+        removed = set()
+        for song in set(paths):
+            track_id = self.playlist.remove(song)
+            if track_id is not None:
+                self.shuffle.remove(track_id)
+                removed.add(track_id)
+        if removed:
+            self.history.remove_ids(removed)
+
+    @audio_command
+    def start_validation(self):
+        if self.playlist:
+            self.validator.validate(list(self.playlist))
+
+    @audio_command
+    def on_validation_finished(self, missing_count):
+        if missing_count:
+            print(f"Проверка плейлиста: убрано отсутствующих файлов - {missing_count}")
+            # Если переключение упало на пропавшем файле, продолжаем уже с проверенным плейлистом
+            if self.play_button_on and not self.off and not self.engine.is_busy():
+                self.play_next_track()
+
+    def stop_scan(self):
+        worker = self.scan_worker
+        self.scan_worker = None
+        # Вызывается и из потока плеера, где нет цикла событий Qt и сигнал finished
+        # не доставляется, поэтому завершившиеся потоки отпускаем при каждом вызове
+        self.stopped_scan_workers = [stopped for stopped in self.stopped_scan_workers if stopped.isRunning()]
+        if worker is not None and worker.isRunning():
+            # Держим ссылку до завершения потока, иначе Qt уничтожит работающий поток
+            worker.stop()
+            self.stopped_scan_workers.append(worker)
+
+    def join_scans(self, timeout=5000):
+        """Останавливает сканирование и ждет завершения всех потоков сканирования"""
+        self.stop_scan()
+        for worker in self.stopped_scan_workers:
+            worker.wait(timeout)
+        self.stopped_scan_workers = []
+
+    def clear_playlist(self):
+        self.stop_scan()
+        self.unwatch_requested.emit()
+        self.waiting_for_tracks = False
+        self.playlist.clear()
+        self.history.clear()
+        self.shuffle.clear()
+        self.prefetcher.clear()
 
-    def find_audio_files_recursive(self, directory):
-        """Рекурсивный поиск аудиофайлов с использованием pathlib"""
-        audio_files = []
 
+    def find_audio_files_recursive(self, directory):
+        """Рекурсивный поиск аудиофайлов за один проход по дереву"""
         try:
-            path = Path(directory)
-            # Рекурсивный поиск всех файлов с нужными расширениями
-            for ext in {'.mp3', '.wav'}:
-                audio_files.extend([
-                    str(file_path) for file_path in path.rglob(f"*{ext}")
-                ])
+            return self.library.scanner.find_audio_files(directory)
         except Exception as e:
             print(f"Ошибка при сканировании директории {directory}: {e}")
-        return audio_files
+            return []
 
     def get_next_track(self):
         if self.playlist:
             if self.random:
                 return self.get_random_song()
             else:
-                return self.playlist[
-                    (self.playlist.index(self.current_song) + 1) % len(self.playlist) if not self.is_first_play else 0]
+                return self.playlist.next_after(self.current_song)
 
     def get_random_song(self):
         if self.playlist:
-            if len(self.playlist) <= 1:
-                return self.playlist[0]
-            # Ищем в плейлисте песню, которой еще не было
-            available_songs = [song for song in self.playlist if song not in self.history]
-            # Если все песни были в истории - берем любую
-            if not available_songs:
-                available_songs = self.playlist
-            # Выбираем случайную из доступных
-            return random.choice(available_songs)
+            # Следующая песня из перемешанной перестановки, без повторов до конца круга
+            track_id = self.shuffle.next()
+            return self.playlist.path(track_id) if track_id is not None else None
 
+    @audio_command
     def play_previous_track(self):
         if self.play_button_on and self.history:
             try:
-                if self.pointer_of_song_in_history > 0:
-                    self.current_song = self.history[self.pointer_of_song_in_history - 1]
-                    while not check_exists(self.current_song):
-                        self.pointer_of_song_in_history -= 1
-                        self.current_song = self.history[self.pointer_of_song_in_history]
-                    self.pointer_of_song_in_history -= 1
+                if self.history.pointer > 0:
+                    self.current_song = self.playlist.path(self.history.back())
                 else:
-                    self.current_song = self.history[0]
+                    self.current_song = self.playlist.path(self.history[0])
                 self.play_track(self.current_song)
-                self.update_song_history.emit(self.current_song,
-                                              self.get_context_songs(self.playlist, self.current_song))
+                self.update_song_history.emit(self.playlist.generation, self.playlist.track_id(self.current_song),
+                                              self.get_context_songs(self.current_song))
+                self.prefetch_next_track()
                 # self.print_history()
 
             except Exception as e:
                 log_error(self.path_to_music, e, "play_previous_track", self.current_song)
                 print("ОШИБКА В play_previous_track, ПЕСНЯ: ", self.current_song, e)
+                self.start_validation()
 
+    @audio_command
     def delete_current_track(self):
         if self.playlist:
             if self.play_button_on:
                 try:
                     deleting_song = self.current_song
+                    self.shuffle.remove(self.playlist.find_id(deleting_song))
                     if len(self.playlist) > 1:
                         self.play_next_track()
-                        self.pointer_of_song_in_history -= 1
-                        self.history.pop(self.pointer_of_song_in_history)
-                        os.remove(deleting_song)
+                        self.history.remove_at(self.history.pointer - 1)
                     else:
                         self.stop_music()
-                        pygame.mixer.music.unload()
-                        os.remove(deleting_song)
+                        self.engine.unload()
+                    self.playlist.remove(deleting_song)
+                    self.prefetcher.discard(deleting_song)
+                    self.trash.delete(deleting_song)
 
                 except Exception as e:
                     log_error(self.path_to_music, e, "delete_current_track", self.current_song)
                     print("ОШИБКА В delete_current_track, ПЕСНЯ: ", self.current_song, e)
 
+    def undo_delete(self):
+        self.trash.undo()
+
+    @audio_command
     def play_next_track(self):
         if self.playlist and self.play_button_on:
             try:
                 # Если я не в конце истории - беру следующий в истории трек
-                if self.pointer_of_song_in_history != -1 and len(self.history) - 1 > self.pointer_of_song_in_history:
-                    self.current_song = self.history[self.pointer_of_song_in_history + 1]
-                    while not check_exists(self.current_song):
-                        self.pointer_of_song_in_history += 1
-                        self.current_song = self.history[self.pointer_of_song_in_history]
+                if self.history.has_next():
+                    self.current_song = self.playlist.path(self.history.forward())
                 # Если я в конце истории - просто беру следующий в плейлисте
                 else:
                     self.current_song = self.get_next_track()
-                    while not check_exists(self.current_song):
-                        self.current_song = self.get_next_track()
-                    self.history.append(self.current_song)
+                    self.history.append(self.playlist.track_id(self.current_song))
 
                 self.play_track(self.current_song)
-                self.pointer_of_song_in_history += 1
-                self.update_song_history.emit(self.current_song,
-                                              self.get_context_songs(self.playlist, self.current_song))
+                self.update_song_history.emit(self.playlist.generation, self.playlist.track_id(self.current_song),
+                                              self.get_context_songs(self.current_song))
+                self.prefetch_next_track()
 
                 # self.print_history()
 
             except Exception as e:
                 log_error(self.path_to_music, e, "play_next_track", self.current_song)
                 print("ОШИБКА В play_next_track, ПЕСНЯ: ", self.current_song, e)
+                # Возможно, файл пропал с диска - проверяем плейлист целиком в фоне
+                self.start_validation()
 
     def play_track(self, song):
-        pygame.mixer.music.load(song)
-        pygame.mixer.music.play()
-        pygame.mixer.music.set_volume(0.0)
-        self._fade_volume(0.0, self.CURRENT_VOLUME)
+        buffer = self.prefetcher.take(song)
+        # Еще не измеренные треки играют без поправки
+        self.track_gain = self.loudness.gain(song) if self.normalize_loudness else 1.0
+        if self.engine.uses_decks:
+            # Деки сами сводят уходящий и входящий трек
+            self.fader.stop()
+            # Громкость получает только входящая дека, уходящая затухает со своей
+            self.engine.play(song, buffer, self.track_volume())
+            self.schedule_crossfade()
+        else:
+            self.engine.set_volume(0.0)
+            self.engine.play(song, buffer)
+            self._fade_volume(0.0, self.track_volume())
+        self.current_buffer = buffer
+
+    def schedule_crossfade(self):
+        self.crossfade_remaining = None
+        length = self.engine.track_length_ms()
+        if length is not None:
+            self.crossfade_deadline = time.monotonic() + max(0, length - self.engine.crossfade_ms) / 1000
+
+    def prefetch_next_track(self):
+        # Пока играет текущий, готовим следующий: читаем в память или сразу декодируем для деки
+        next_song = self.predict_next_track()
+        self.metadata.request([self.current_song, next_song])
+        if self.engine.uses_decks:
+            self.engine.prepare(next_song)
+        else:
+            self.prefetcher.prefetch(next_song)
+
+    def predict_next_track(self):
+        """Трек, который с наибольшей вероятностью заиграет следующим"""
+        next_id = self.history.peek_next()
+        if next_id is not None:
+            return self.playlist.path(next_id)
+        if self.random:
+            track_id = self.shuffle.peek()
+            return self.playlist.path(track_id) if track_id is not None else None
+        return self.playlist.next_after(self.current_song)
 
     def print_history(self):
         """Цветной вывод истории"""
@@ -240,67 +547,50 @@ class AudioPlayerThread(QThread):
         print("\033[1;36m🎵 ИСТОРИЯ ВОСПРОИЗВЕДЕНИЯ\033[0m")
         print("\033[1;36m" + "─" * 50 + "\033[0m")
 
-        for i, song in enumerate(self.history):
-            song_name = os.path.basename(song)
+        for i, track_id in enumerate(self.history):
+            song_name = os.path.basename(self.playlist.path(track_id))
 
-            if i == self.pointer_of_song_in_history:
+            if i == self.history.pointer:
                 print(f"\033[1;32m▶ [{i:2d}] {song_name}\033[0m")
             else:
                 print(f"\033[90m  [{i:2d}] {song_name}\033[0m")
 
         print("\033[1;36m" + "─" * 50 + "\033[0m")
 
-    def get_context_songs(self, song_list, current_song):
-        if not song_list:
-            return []
-
-        try:
-            current_index = song_list.index(current_song)
-        except ValueError:
-            return song_list[:11]
-
-        if len(song_list) <= 11:
-            return song_list
-
-        # Вычисляем стартовый индекс
-        start_index = max(0, min(current_index - 5, len(song_list) - 11))
-        return song_list[start_index:start_index + 11]
+    def get_context_songs(self, current_song):
+        # id окна из 11 треков вокруг текущего, пути GUI получает у плейлиста по запросу
+        return self.playlist.context(current_song, 11)
 
     def _fade_volume(self, start_volume, end_volume, custom_callback=None, fade_duration=2500):
-        self.fade_timer.stop()
-        self.current_volume = start_volume
-        self.target_volume = end_volume
+        # Громкость меняет поток фейдера по реальному времени, GUI-поток ждет только конца фейда
+        self.fade_id += 1
         self.custom_callback = custom_callback
-        self.fade_duration = fade_duration
-        self.fade_timer.start(50)
-
-    def _update_fade(self):
-        """Обновление громкости на каждом шаге фейда"""
-        # Рассчитываем шаг изменения громкости для 15 секунд
-        total_steps = self.fade_duration / 100  # 15000ms / 100ms = 150 шагов
-        step = 1.0 / total_steps  # Шаг изменения громкости
+        self.fader.start(start_volume, end_volume, fade_duration, self.fade_id)
 
-        if self.current_volume < self.target_volume:
-            self.current_volume = min(self.current_volume + step, self.target_volume)
-        else:
-            self.current_volume = max(self.current_volume - step, self.target_volume)
-
-        # Устанавливаем громкость
-        pygame.mixer.music.set_volume(self.current_volume)
-
-        # Проверяем достижение целевой громкости
-        if abs(self.current_volume - self.target_volume) < 0.01:
-            self.fade_timer.stop()
-            self.current_volume = self.target_volume
-
-            if self.custom_callback:
-                self.custom_callback()
+    @audio_command
+    def _on_fade_finished(self, fade_id):
+        """Окончание фейда (из потока фейдера приходит через очередь команд)"""
+        if fade_id == self.fade_id and self.custom_callback:
+            callback = self.custom_callback
+            self.custom_callback = None
+            callback()
 
     def quit(self):
         """Корректное завершение"""
-        self.fade_timer.stop()
-
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
+        self.fader.shutdown()
+        self.validation_timer.stop()
+        self.validator.shutdown()
+        self.folder_watcher.stop()
+        self.music_end_watcher.stop()
+        self.prefetcher.shutdown()
+        self.trash.shutdown()
+        self.loudness.close()
+        # Поток плеера сам освобождает pygame после последней команды
+        self.commands.put((None, ()))
+        self.wait(3000)
+        # Команды больше не выполняются, новое сканирование не начнется; база нужна потокам до конца
+        self.join_scans()
+        self.metadata.close()
+        self.library.close()
 
         super().quit()
@@ -0,0 +1,249 @@
+import os
+from array import array
+
+NO_ID = 0xFFFFFFFF  # Нет трека / нет позиции
+
+
+def _encode(name):
+    # surrogatepass сохраняет и имена, которые ОС отдала с "неправильными" байтами
+    return name.encode("utf-8", "surrogatepass")
+
+
+def _decode(data):
+    return data.decode("utf-8", "surrogatepass")
+
+
+class TrackTable:
+    """Таблицы путей одного поколения плейлиста.
+
+    Имена файлов лежат подряд в одном bytearray (UTF-8), границы имени
+    трека - в таблице смещений. Поиск id по пути идет через хеш-таблицу с
+    открытой адресацией в array('I'), так что на трек не приходится ни
+    одного Python-объекта. Таблицы только дописываются: id, выданный в
+    этом поколении, можно разрешить в путь из любого потока.
+    """
+
+    MIN_SLOTS = 1024  # Начальный размер хеш-таблицы (степень двойки)
+
+    def __init__(self, generation=0):
+        self.generation = generation  # Номер поколения, растет при каждой очистке плейлиста
+        self.directories = []  # Таблица папок: id папки -> путь папки
+        self.directory_ids = {}  # Путь папки -> id папки
+        self.names = bytearray()  # Имена файлов подряд, в UTF-8
+        self.name_offsets = array('I', [0])  # id трека -> начало имени, конец - начало следующего
+        self.track_directories = array('I')  # id трека -> id папки
+        self.slots = array('I', [NO_ID]) * self.MIN_SLOTS  # Хеш-таблица (папка, имя) -> id трека
+
+    def __len__(self):
+        return len(self.track_directories)
+
+    def find(self, directory, name):
+        """id трека или None, если такого пути в таблице нет"""
+        directory_id = self.directory_ids.get(directory)
+        if directory_id is None:
+            return None
+        track_id = self.slots[self._find_slot(directory_id, _encode(name))]
+        return track_id if track_id != NO_ID else None
+
+    def add(self, directory, name):
+        """id трека, при необходимости путь дописывается в таблицы"""
+        directory_id = self.directory_ids.get(directory)
+        if directory_id is None:
+            directory_id = self.directory_ids[directory] = len(self.directories)
+            self.directories.append(directory)
+        key = _encode(name)
+        slot = self._find_slot(directory_id, key)
+        track_id = self.slots[slot]
+        if track_id != NO_ID:
+            return track_id
+
+        track_id = len(self.track_directories)
+        # Сначала имя, потом смещение - читатель из другого потока не увидит половину имени
+        self.names += key
+        self.name_offsets.append(len(self.names))
+        self.track_directories.append(directory_id)
+        self.slots[slot] = track_id
+        if len(self.track_directories) * 2 > len(self.slots):
+            self._grow()
+        return track_id
+
+    def name(self, track_id):
+        return _decode(self._name_bytes(track_id))
+
+    def path(self, track_id):
+        return os.path.join(self.directories[self.track_directories[track_id]], self.name(track_id))
+
+    def _name_bytes(self, track_id):
+        return self.names[self.name_offsets[track_id]:self.name_offsets[track_id + 1]]
+
+    def _find_slot(self, directory_id, key):
+        # Слот с этим путем или первый свободный слот на его цепочке
+        slots = self.slots
+        mask = len(slots) - 1
+        slot = hash((directory_id, key)) & mask
+        while True:
+            track_id = slots[slot]
+            if track_id == NO_ID or (self.track_directories[track_id] == directory_id
+                                     and self._name_bytes(track_id) == key):
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        slots = array('I', [NO_ID]) * (len(self.slots) * 2)
+        mask = len(slots) - 1
+        for track_id, directory_id in enumerate(self.track_directories):
+            slot = hash((directory_id, bytes(self._name_bytes(track_id)))) & mask
+            while slots[slot] != NO_ID:
+                slot = (slot + 1) & mask
+            slots[slot] = track_id
+        self.slots = slots
+
+
+class Playlist:
+    """Компактный плейлист: таблица папок, таблица имен файлов и id треков.
+
+    Каждый путь хранится один раз - как id папки и имя файла в TrackTable;
+    полный путь собирается только по запросу (path). Порядок воспроизведения
+    и позиции треков лежат в array('I'), поэтому поиск позиции, следующего
+    трека и окна контекста не требуют линейного прохода. Удаление оставляет
+    "дырку" (NO_ID), порядок уплотняется, когда дырок становится больше, чем
+    живых треков. id трека остается действительным и после удаления трека -
+    по нему на трек ссылаются история, перемешивание и сигналы в GUI. clear()
+    начинает новое поколение таблиц, id прошлых поколений разрешаются через
+    resolve() только вместе с номером своего поколения.
+    """
+
+    def __init__(self, paths=()):
+        self.tracks = TrackTable()  # Таблицы путей текущего поколения
+        self.order = array('I')  # id треков в порядке воспроизведения, NO_ID - удаленный трек
+        self.positions = array('I')  # id трека -> позиция в order, NO_ID - трека нет в плейлисте
+        self.count = 0  # Количество треков в плейлисте
+        self.extend(paths)
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __contains__(self, path):
+        track_id = self.find_id(path)
+        return track_id is not None and self.positions[track_id] != NO_ID
+
+    def __iter__(self):
+        return (self.path(track_id) for track_id in self.ids())
+
+    def ids(self):
+        return (track_id for track_id in self.order if track_id != NO_ID)
+
+    @property
+    def generation(self):
+        return self.tracks.generation
+
+    def find_id(self, path):
+        """id пути или None, если путь еще не встречался"""
+        return self.tracks.find(*os.path.split(path))
+
+    def track_id(self, path):
+        """Постоянный id пути, при необходимости путь добавляется в таблицы"""
+        track_id = self.tracks.add(*os.path.split(path))
+        if track_id == len(self.positions):
+            self.positions.append(NO_ID)
+        return track_id
+
+    def path(self, track_id):
+        return self.tracks.path(track_id)
+
+    def name(self, track_id):
+        return self.tracks.name(track_id)
+
+    def resolve(self, generation, track_ids):
+        """Пути треков по id поколения generation (None, если плейлист с тех пор очищен).
+
+        Можно вызывать из другого потока, пока плеер дописывает плейлист.
+        """
+        tracks = self.tracks
+        if tracks.generation != generation:
+            return None
+        return [tracks.path(track_id) for track_id in track_ids]
+
+    def append(self, path):
+        track_id = self.track_id(path)
+        if self.positions[track_id] == NO_ID:
+            self.positions[track_id] = len(self.order)
+            self.order.append(track_id)
+            self.count += 1
+        return track_id
+
+    def extend(self, paths):
+        """Добавляет пути, возвращает их id"""
+        return [self.append(path) for path in paths]
+
+    def remove(self, path):
+        """Удаляет путь из плейлиста, возвращает его id (None, если его не было)"""
+        track_id = self.find_id(path)
+        if track_id is None or self.positions[track_id] == NO_ID:
+            return None
+        self.order[self.positions[track_id]] = NO_ID
+        self.positions[track_id] = NO_ID
+        self.count -= 1
+        if len(self.order) - self.count > self.count:
+            self._compact()
+        return track_id
+
+    def clear(self):
+        self.tracks = TrackTable(self.tracks.generation + 1)
+        self.order = array('I')
+        self.positions = array('I')
+        self.count = 0
+
+    def index(self, path):
+        track_id = self.find_id(path)
+        if track_id is None or self.positions[track_id] == NO_ID:
+            raise KeyError(path)
+        return self.positions[track_id]
+
+    def first(self):
+        track_id = next(self.ids(), None)
+        return self.path(track_id) if track_id is not None else None
+
+    def next_after(self, path):
+        """Следующий трек после path по кругу; первый, если path нет в плейлисте"""
+        track_id = self.find_id(path) if path else None
+        if track_id is None or self.positions[track_id] == NO_ID:
+            return self.first()
+        order = self.order
+        for i in range(self.positions[track_id] + 1, len(order)):
+            if order[i] != NO_ID:
+                return self.path(order[i])
+        return self.first()
+
+    def context(self, path, size=11):
+        """id окна из size треков вокруг path (текущий по возможности в середине)"""
+        track_id = self.find_id(path) if path else None
+        if track_id is None or self.positions[track_id] == NO_ID:
+            return array('I', (track_id for _, track_id in zip(range(size), self.ids())))
+
+        position = self.positions[track_id]
+        before = self._collect(position - 1, -1, size - 1)
+        after = self._collect(position + 1, 1, size - 1)
+        take_before = min(size // 2, len(before))
+        take_after = min(size - 1 - take_before, len(after))
+        take_before = min(len(before), size - 1 - take_after)
+        return array('I', before[:take_before][::-1] + [track_id] + after[:take_after])
+
+    def _collect(self, start, step, limit):
+        result = []
+        order = self.order
+        i = start
+        while 0 <= i < len(order) and len(result) < limit:
+            if order[i] != NO_ID:
+                result.append(order[i])
+            i += step
+        return result
+
+    def _compact(self):
+        self.order = array('I', self.ids())
+        positions = self.positions
+        for position, track_id in enumerate(self.order):
+            positions[track_id] = position
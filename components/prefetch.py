@@ -0,0 +1,81 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TrackPrefetcher:
+    """Фоновое чтение следующего трека в память.
+
+    pygame.mixer.music.load() из буфера в памяти не ждет диск, поэтому
+    переключение на заранее прочитанный трек происходит мгновенно.
+    Буферы хранятся в LRU, суммарный объем ограничен memory_limit_mb.
+    """
+
+    def __init__(self, memory_limit_mb=64):
+        self.memory_limit_mb = memory_limit_mb
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.buffers = OrderedDict()  # Путь -> содержимое файла
+        self.pending = set()  # Пути, которые читаются сейчас
+        self.used = 0  # Занято байт
+
+    @property
+    def memory_limit(self):
+        return self.memory_limit_mb * 1024 * 1024
+
+    def prefetch(self, path):
+        if not path or self.memory_limit <= 0:
+            return
+        with self.lock:
+            if path in self.buffers:
+                self.buffers.move_to_end(path)
+                return
+            if path in self.pending:
+                return
+            self.pending.add(path)
+        self.pool.submit(self._read, path)
+
+    def _read(self, path):
+        try:
+            if os.path.getsize(path) > self.memory_limit:
+                return
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        finally:
+            with self.lock:
+                self.pending.discard(path)
+
+        with self.lock:
+            self.buffers[path] = data
+            self.used += len(data)
+            while self.used > self.memory_limit and self.buffers:
+                _, evicted = self.buffers.popitem(last=False)
+                self.used -= len(evicted)
+
+    def take(self, path):
+        """Забирает буфер трека, если он уже прочитан. Никогда не ждет диск."""
+        with self.lock:
+            data = self.buffers.pop(path, None)
+            if data is None:
+                return None
+            self.used -= len(data)
+        return io.BytesIO(data)
+
+    def discard(self, path):
+        with self.lock:
+            data = self.buffers.pop(path, None)
+            if data is not None:
+                self.used -= len(data)
+
+    def clear(self):
+        with self.lock:
+            self.buffers.clear()
+            self.used = 0
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
+        self.clear()
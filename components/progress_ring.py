@@ -0,0 +1,37 @@
+DASH_STEPS = 1000  # Сколько различимых положений у обводки
+
+
+def quantize_dash(start_dash):
+    """Положение обводки, округленное до шага кадра"""
+    return round(start_dash * DASH_STEPS) / DASH_STEPS
+
+
+def ring_dash(progress):
+    """Положение обводки для доли прошедшего периода"""
+    # От 1 до 0.01 по мере уменьшения времени, для работы и для перерыва
+    return quantize_dash(max(0.0, min(1, 1 - progress * 0.99)))
+
+
+class ProgressRing:
+    """Положение обводки окна.
+
+    Окно перерисовывает обводку только когда update() или reset() вернули
+    True, то есть обводка действительно сдвинулась на шаг кадра.
+    """
+
+    def __init__(self):
+        self.dash = 1.0  # Текущее положение обводки, 1 - полная
+
+    def update(self, progress):
+        """Пересчет по доле прошедшего периода; True, если обводку нужно перерисовать"""
+        return self._set(ring_dash(progress))
+
+    def reset(self):
+        """Полная обводка; True, если обводку нужно перерисовать"""
+        return self._set(1.0)
+
+    def _set(self, dash):
+        if dash == self.dash:
+            return False
+        self.dash = dash
+        return True
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+from PyQt5.QtCore import QPointF, Qt
+from PyQt5.QtGui import QBrush, QColor, QConicalGradient, QPainter, QPen, QPixmap
+
+from components.progress_ring import quantize_dash
+
+
+class RingCache:
+    """Готовые кадры градиентной обводки окна.
+
+    Кадр рисуется один раз в QPixmap размером с область обводки и дальше
+    выводится одним drawPixmap. Ключ кадра - положение обводки, период,
+    цвета, размер контейнера и плотность пикселей экрана; последние
+    кадры хранятся в LRU.
+    """
+
+    def __init__(self, max_frames=8):
+        self.max_frames = max_frames
+        self.frames = OrderedDict()
+
+    def clear(self):
+        self.frames.clear()
+
+    def pixmap(self, start_dash, is_rest_period, first_color, second_color, inner_x, inner_y, width, height, dpr):
+        key = (quantize_dash(start_dash), is_rest_period, first_color, second_color, inner_x, inner_y, width, height,
+               dpr)
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.frames.move_to_end(key)
+            return frame
+
+        frame = self._render(*key)
+        self.frames[key] = frame
+        while len(self.frames) > self.max_frames:
+            self.frames.popitem(last=False)
+        return frame
+
+    @staticmethod
+    def _render(start_dash, is_rest_period, first_color, second_color, inner_x, inner_y, width, height, dpr):
+        # Кадр покрывает окно от (0, 0) до внешнего края обводки, координаты те же, что у окна
+        frame = QPixmap(round((inner_x + width + inner_x) * dpr), round((inner_y + height + inner_y) * dpr))
+        frame.setDevicePixelRatio(dpr)
+        frame.fill(Qt.transparent)
+
+        painter = QPainter(frame)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # ГРАДИЕНТНАЯ ЦВЕТНАЯ ОБВОДКА
+        gradient = QConicalGradient()  # Конический градиент
+        # Центр как у QRect.center() контейнера в его собственных координатах
+        gradient.setCenter(QPointF((width - 1) // 2, (height - 1) // 2))
+        gradient.setAngle(90)
+        painter.setBrush(QBrush(QColor("transparent")))
+
+        if not is_rest_period:
+            gradient.setColorAt(1.00, QColor(first_color))
+            gradient.setColorAt(0.999, QColor("transparent"))
+            gradient.setColorAt(start_dash, QColor("transparent"))
+            gradient.setColorAt(start_dash - 0.01, QColor(second_color))
+            gradient.setColorAt(0.00, QColor(first_color))
+        else:
+            gradient.setColorAt(1.00, QColor(first_color))
+            gradient.setColorAt(0.999, QColor(first_color))
+            gradient.setColorAt(start_dash, QColor(second_color))
+            gradient.setColorAt(start_dash - 0.01, QColor("transparent"))
+            gradient.setColorAt(0.00, QColor("transparent"))
+
+        painter.setPen(QPen(QBrush(gradient), 10))
+        painter.drawRoundedRect(inner_x - 10, inner_y - 10, width + 20, height + 20, 69, 69)
+        painter.end()
+        return frame
@@ -0,0 +1,123 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav')  # Поддерживаемые форматы
+
+
+def is_audio_file(name):
+    return name.lower().endswith(AUDIO_EXTENSIONS)
+
+
+class ScanStats:
+    """Статистика одного прохода сканера"""
+
+    def __init__(self):
+        self.files = 0  # Найдено аудиофайлов в прочитанных папках
+        self.dirs = 0  # Обработано папок
+        self.listed_dirs = 0  # Из них реально прочитано через scandir
+        self.elapsed = 0.0  # Время прохода в секундах
+
+    @property
+    def files_per_sec(self):
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def dirs_per_sec(self):
+        return self.dirs / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.files} файлов, {self.dirs} папок ({self.listed_dirs} прочитано) за {self.elapsed:.2f} с - "
+                f"{self.files_per_sec:.0f} файлов/с, {self.dirs_per_sec:.0f} папок/с")
+
+
+def _visit(directory, known):
+    """Обрабатывает одну папку: (путь, mtime, файлы или None, подпапки)"""
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        return directory, None, None, []
+
+    if known is not None and known[0] == mtime:
+        # Папка не менялась - подпапки берем из индекса, файлы не читаем
+        return directory, mtime, None, known[1]
+
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif is_audio_file(entry.name):
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"Ошибка при сканировании директории {directory}: {e}")
+        return directory, None, None, []
+    return directory, mtime, files, subdirs
+
+
+class AudioScanner:
+    """Однопроходный обход папок на os.scandir с раздачей подпапок в пул потоков.
+
+    Все расширения проверяются за один проход, поэтому время сканирования
+    растет с числом файлов, а не с числом файлов на число расширений.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self.last_stats = ScanStats()
+
+    def scan(self, root, known=None, on_directory=None, descend_unchanged=True):
+        """Обходит дерево root.
+
+        known - словарь {папка: (mtime, подпапки)} из индекса; неизменившиеся
+        папки не перечитываются. on_directory(папка, родитель, mtime, файлы)
+        вызывается в вызывающем потоке для каждой папки, файлы равны None,
+        если папка взята из индекса. При descend_unchanged=False обход не
+        спускается в неизменившиеся папки. Возвращает множество посещенных папок.
+        """
+        known = known or {}
+        stats = ScanStats()
+        visited = set()
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            parents = {}
+            pending = {pool.submit(_visit, root, known.get(root))}
+            parents[root] = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory, mtime, files, subdirs = future.result()
+                    if mtime is None:
+                        continue
+                    visited.add(directory)
+                    stats.dirs += 1
+                    if files is not None:
+                        stats.listed_dirs += 1
+                        stats.files += len(files)
+                    elif not descend_unchanged:
+                        subdirs = []
+                    for subdir in subdirs:
+                        parents[subdir] = directory
+                        pending.add(pool.submit(_visit, subdir, known.get(subdir)))
+                    if on_directory:
+                        on_directory(directory, parents[directory], mtime, files)
+
+        stats.elapsed = time.perf_counter() - start
+        self.last_stats = stats
+        return visited
+
+    def find_audio_files(self, root):
+        """Полный список аудиофайлов без индекса"""
+        audio_files = []
+
+        def collect(directory, parent, mtime, files):
+            audio_files.extend(os.path.join(directory, name) for name in files)
+
+        self.scan(root, on_directory=collect)
+        return audio_files
@@ -0,0 +1,117 @@
+import random
+
+
+class ShuffleBag:
+    """Случайный порядок без повторов: перемешанная перестановка и курсор.
+
+    Когда перестановка пройдена, она перемешивается заново. Вставка,
+    удаление, next и previous работают за O(1) (удаление уже сыгранного
+    трека оставляет "дырку", которая вычищается при следующем перемешивании).
+    После previous() курсор стоит внутри сыгранной части: next() сначала
+    идет по ней вперед, пропуская дырки, а новые треки по-прежнему
+    добавляются только после самого дальнего сыгранного.
+    """
+
+    def __init__(self, items=()):
+        self.order = []  # Перестановка треков, None - удаленный уже сыгранный трек
+        self.positions = {}  # Трек -> позиция в перестановке
+        self.cursor = -1  # Позиция текущего трека
+        self.dealt = -1  # Позиция самого дальнего сыгранного трека, дальше - не сыгранная часть
+        self.holes = 0  # Количество дырок в сыгранной части
+        self.extend(items)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def clear(self):
+        self.order = []
+        self.positions = {}
+        self.cursor = -1
+        self.dealt = -1
+        self.holes = 0
+
+    def add(self, item):
+        """Вставляет трек в случайное место еще не сыгранной части"""
+        if item in self.positions:
+            return
+        self.order.append(item)
+        last = len(self.order) - 1
+        self.positions[item] = last
+        swap = random.randint(self.dealt + 1, last)
+        self._swap(swap, last)
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def remove(self, item):
+        position = self.positions.pop(item, None)
+        if position is None:
+            return
+        if position > self.dealt:
+            # Не сыгранный трек - ставим на его место последний и отрезаем хвост
+            moved = self.order.pop()
+            if position < len(self.order):
+                self.order[position] = moved
+                self.positions[moved] = position
+        else:
+            self.order[position] = None
+            self.holes += 1
+
+    def next(self):
+        if not self.positions:
+            return None
+        cursor = self._next_position()
+        if cursor >= len(self.order):
+            self._refill()
+            cursor = 0
+        self.cursor = cursor
+        self.dealt = max(self.dealt, cursor)
+        return self.order[cursor]
+
+    def peek(self):
+        """Следующий трек без сдвига курсора (None, если нужна перетасовка)"""
+        cursor = self._next_position()
+        if cursor < len(self.order):
+            return self.order[cursor]
+        return None
+
+    def previous(self):
+        cursor = self.cursor - 1
+        while cursor >= 0 and self.order[cursor] is None:
+            cursor -= 1
+        if cursor < 0:
+            return None
+        self.cursor = cursor
+        return self.order[cursor]
+
+    def _next_position(self):
+        # Дырки бывают только в сыгранной части, не сыгранная часть сплошная
+        cursor = self.cursor + 1
+        while cursor <= self.dealt and self.order[cursor] is None:
+            cursor += 1
+        return cursor
+
+    def _refill(self):
+        last_played = self.order[self.cursor] if self.cursor >= 0 else None
+        self.order = [item for item in self.order if item is not None]
+        random.shuffle(self.order)
+        # Не повторяем последний трек сразу после перетасовки
+        if len(self.order) > 1 and self.order[0] == last_played:
+            swap = random.randint(1, len(self.order) - 1)
+            self.order[0], self.order[swap] = self.order[swap], self.order[0]
+        self.positions = {item: position for position, item in enumerate(self.order)}
+        self.cursor = -1
+        self.dealt = -1
+        self.holes = 0
+
+    def _swap(self, first, second):
+        if first == second:
+            return
+        order = self.order
+        order[first], order[second] = order[second], order[first]
+        self.positions[order[first]] = first
+        self.positions[order[second]] = second
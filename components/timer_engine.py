@@ -0,0 +1,119 @@
+import math
+import time
+
+ALARM_SECONDS = 4  # За сколько секунд до конца периода звучит сигнал
+TICK_EPSILON = 0.001  # Запас на погрешность часов при округлении оставшегося времени, с
+
+
+class SimulatedClock:
+    """Часы, которые идут только по advance() - для прогона расписания без ожидания"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TimerEngine:
+    """Таймер работа/перерыв без Qt.
+
+    Конец периода хранится как точка на часах clock (по умолчанию
+    time.monotonic), остаток пересчитывается в update(). Интерфейс
+    подписывается на колбэки и сам планирует следующий вызов update()
+    через next_tick_delay().
+    """
+
+    def __init__(self, work_interval, rest_interval, clock=time.monotonic):
+        self.clock = clock
+        self.work_interval = work_interval  # Длительность работы, с
+        self.rest_interval = rest_interval  # Длительность перерыва, с
+        self.is_running = False
+        self.is_rest_period = False  # False = работа, True = перерыв
+        self.remaining_time = work_interval  # Сколько целых секунд осталось до конца периода
+        self.remaining_exact = float(work_interval)  # Точный остаток периода на паузе, с
+        self.period_deadline = None  # Конец периода по clock(), пока таймер идет
+        self.alarm_played = False  # Сигнал конца текущего периода уже прозвучал
+
+        self.on_tick = None  # on_tick(remaining_time) - остаток пересчитан
+        self.on_alarm = None  # on_alarm(is_rest_period) - до конца периода ALARM_SECONDS или меньше
+        self.on_period_switched = None  # on_period_switched(alarm_missed) - начался новый период
+
+    def interval(self):
+        """Длительность текущего периода"""
+        return self.rest_interval if self.is_rest_period else self.work_interval
+
+    def progress(self):
+        """Доля прошедшего времени текущего периода (0..1)"""
+        interval = self.interval()
+        return (interval - self.remaining_time) / interval if interval else 1.0
+
+    def start(self):
+        if not self.is_running:
+            self.is_running = True
+            # Опоздавшие вызовы update() не растягивают период - считаем от дедлайна
+            self.period_deadline = self.clock() + self.remaining_exact
+
+    def pause(self):
+        if self.is_running:
+            self.is_running = False
+            self.remaining_exact = max(0.0, self.period_deadline - self.clock())
+            self.period_deadline = None
+
+    def reset(self):
+        """Остановка и начало рабочего периода с начала"""
+        self.pause()
+        self.is_rest_period = False
+        self.set_remaining(self.work_interval)
+
+    def set_remaining(self, seconds):
+        """Задает остаток текущего периода"""
+        self.remaining_time = seconds
+        self.remaining_exact = float(seconds)
+        self.alarm_played = False
+        if self.is_running:
+            self.period_deadline = self.clock() + seconds
+
+    def next_tick_delay(self):
+        """Через сколько секунд остаток уменьшится на секунду (None на паузе)"""
+        if not self.is_running:
+            return None
+        left = self.period_deadline - self.clock() - TICK_EPSILON
+        return left - (math.ceil(left) - 1)
+
+    def update(self):
+        """Пересчет остатка от дедлайна, переключение периодов и сигнал"""
+        if self.is_running:
+            now = self.clock()
+            alarm_played = self.alarm_played
+            periods_ended = 0
+            # После сна системы или зависания интерфейса могли закончиться сразу несколько периодов
+            while self.period_deadline <= now:
+                self._switch_period()
+                periods_ended += 1
+            if periods_ended and self.on_period_switched:
+                self.on_period_switched(periods_ended > 1 or not alarm_played)
+            self.remaining_time = max(0, math.ceil(self.period_deadline - now - TICK_EPSILON))
+
+            if not self.alarm_played and 0 < self.remaining_time <= ALARM_SECONDS:
+                self.alarm_played = True
+                if self.on_alarm:
+                    self.on_alarm(self.is_rest_period)
+
+        if self.on_tick:
+            self.on_tick(self.remaining_time)
+        return self.remaining_time
+
+    def _switch_period(self):
+        """Переключение между работой и перерывом"""
+        self.is_rest_period = not self.is_rest_period
+        self.remaining_time = self.interval()
+        self.alarm_played = False
+        if self.is_running:
+            # Новый период отсчитывается от конца предыдущего, а не от момента вызова
+            self.period_deadline += self.remaining_time
+        else:
+            self.remaining_exact = float(self.remaining_time)
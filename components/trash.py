@@ -0,0 +1,161 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from components.utils import get_app_data_dir, log_error
+
+TRASH_DIR_NAME = "trash"
+
+
+class TrashQueue(QObject):
+    """Отложенное удаление треков с возможностью отмены.
+
+    Файлы переносятся в локальную корзину в фоновом потоке и удаляются
+    окончательно только по истечении GRACE_PERIOD. Все накопившиеся
+    запросы обрабатываются за один проход. Отмена возвращает последний
+    удаленный трек на место (если он еще не перенесен - просто снимает
+    его с очереди).
+    """
+    pending_changed = pyqtSignal(int)  # Сколько удалений еще можно отменить
+    restored = pyqtSignal(list)  # [путь трека, возвращенного на место]
+
+    GRACE_PERIOD = 60.0  # Через сколько секунд файл удаляется окончательно
+    RETRY_INTERVAL = 2.0  # Пауза перед повтором переноса (файл может быть еще открыт)
+    MAX_ATTEMPTS = 5  # Попыток переноса файла
+
+    def __init__(self, trash_dir=None):
+        super().__init__()
+        self.trash_dir = trash_dir or get_app_data_dir() / TRASH_DIR_NAME
+        self.trash_dir.mkdir(parents=True, exist_ok=True)
+        self.condition = threading.Condition()
+        self.requests = []  # Еще не перенесенные файлы: [путь, попыток, время следующей попытки, номер удаления]
+        self.trashed = []  # Перенесенные файлы: (исходный путь, путь в корзине, срок удаления, номер удаления)
+        self.deletions = 0  # Номер последнего удаления - по нему отмена находит самое свежее
+        self.undo_requests = 0  # Сколько отмен еще не обработано
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="TrashQueue", daemon=True)
+        self.thread.start()
+
+    def delete(self, path):
+        with self.condition:
+            self.deletions += 1
+            self.requests.append([path, 0, 0.0, self.deletions])
+            self.condition.notify()
+
+    def undo(self):
+        with self.condition:
+            self.undo_requests += 1
+            self.condition.notify()
+
+    def shutdown(self):
+        """Переносит и удаляет все, что осталось в очереди, и останавливает поток"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join(5)
+
+    def _next_timeout(self):
+        deadlines = [request[2] for request in self.requests]
+        deadlines.extend(entry[2] for entry in self.trashed)
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _has_work(self):
+        now = time.monotonic()
+        return bool(self.undo_requests
+                    or any(request[2] <= now for request in self.requests)
+                    or any(entry[2] <= now for entry in self.trashed))
+
+    def _run(self):
+        # Файлы из корзины прошлого запуска уже пережили отмену - удаляем
+        self._purge_leftovers()
+        while True:
+            with self.condition:
+                while self.running and not self._has_work():
+                    self.condition.wait(self._next_timeout())
+                undo, self.undo_requests = self.undo_requests, 0
+                restore = []
+                for _ in range(undo):
+                    # Отменяется самое свежее удаление, где бы оно ни было: в очереди
+                    # (в том числе на повторе после ошибки) или уже в корзине
+                    latest_request = max(self.requests, key=lambda request: request[3], default=None)
+                    latest_trashed = max(self.trashed, key=lambda entry: entry[3], default=None)
+                    if latest_request is None and latest_trashed is None:
+                        break
+                    if latest_trashed is None or (latest_request is not None
+                                                  and latest_request[3] > latest_trashed[3]):
+                        # Файл еще не трогали - достаточно снять его с очереди
+                        self.requests.remove(latest_request)
+                        self.restored.emit([latest_request[0]])
+                    else:
+                        self.trashed.remove(latest_trashed)
+                        restore.append(latest_trashed)
+                now = time.monotonic()
+                final = not self.running
+                due = [request for request in self.requests if final or request[2] <= now]
+                self.requests = [request for request in self.requests if request not in due]
+
+            # Файловые операции - без блокировки, чтобы delete() и undo() не ждали диск
+            for path, target, _, _ in restore:
+                self._restore(path, target)
+            self._move_to_trash(due, final)
+            self._commit(final)
+            with self.condition:
+                self.pending_changed.emit(len(self.requests) + len(self.trashed))
+                if final:
+                    break
+
+    def _move_to_trash(self, requests, final):
+        for request in requests:
+            path = request[0]
+            target = self.trash_dir / f"{uuid.uuid4().hex}_{os.path.basename(path)}"
+            try:
+                shutil.move(path, target)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                request[1] += 1
+                if request[1] < self.MAX_ATTEMPTS and not final:
+                    request[2] = time.monotonic() + self.RETRY_INTERVAL
+                    with self.condition:
+                        self.requests.append(request)
+                else:
+                    log_error(error=e, method_prefix="TrashQueue: перенос в корзину", song=path)
+                continue
+            self.trashed.append((path, target, time.monotonic() + self.GRACE_PERIOD, request[3]))
+
+    def _commit(self, final):
+        now = time.monotonic()
+        expired = [entry for entry in self.trashed if final or entry[2] <= now]
+        if not expired:
+            return
+        self.trashed = [entry for entry in self.trashed if entry not in expired]
+        for path, target, _, _ in expired:
+            try:
+                os.remove(target)
+            except OSError as e:
+                log_error(error=e, method_prefix="TrashQueue: удаление", song=path)
+
+    def _restore(self, path, target):
+        try:
+            shutil.move(target, path)
+        except OSError as e:
+            log_error(error=e, method_prefix="TrashQueue: восстановление", song=path)
+            return
+        self.restored.emit([path])
+
+    def _purge_leftovers(self):
+        try:
+            entries = list(os.scandir(self.trash_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
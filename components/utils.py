@@ -109,6 +109,7 @@ def check_settings(version):
         "rest_interval": "5",
         "music_path": "",
         "random": False,
+        "watch_music_folder": True,
         "background_color": "#333333",
         "first_gradient_color": "#FB06AD",
         "second_gradient_color": "#FF8C00",
@@ -116,6 +117,16 @@ def check_settings(version):
         "background_transparency": "99",
         "current_color_scheme": 1,
         "volume": 50,
+        "prefetch_memory_mb": 64,
+        "crossfade_ms": 0,
+        "fade_curve": "equal_power",
+        "audio_process": False,
+        "normalize_loudness": True,
+        "history_depth": 500,
+        "mixer_frequency": 44100,
+        "mixer_size": -16,
+        "mixer_channels": 2,
+        "mixer_buffer": 512,
         "scheme_1_first_color": "#ffd700",
         "scheme_1_second_color": "#ff00a5",
         "scheme_2_first_color": "#ffffff",
@@ -182,6 +193,13 @@ def check_settings(version):
         print(f"Ошибка при чтении настроек: {e}")
 
 
+# ВОЗВРАЩАЕТ ПАПКУ ПРИЛОЖЕНИЯ В APPDATA
+def get_app_data_dir():
+    app_dir = Path(os.getenv('APPDATA') or os.path.expanduser("~")) / "FocusTimer"
+    app_dir.mkdir(parents=True, exist_ok=True)
+    return app_dir
+
+
 # ВОЗВРАЩАЕТ НАСТРОЙКИ ИЗ APPDATA
 def load_settings():
     appdata = os.getenv('APPDATA')
@@ -0,0 +1,55 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PlaylistValidator:
+    """Фоновая проверка, что файлы плейлиста все еще существуют.
+
+    Пути проверяются порциями через пул потоков. Отсутствующие файлы
+    передаются в on_missing после каждой порции, общее количество - в
+    on_finished. Колбэки вызываются из фонового потока.
+    """
+
+    BATCH_SIZE = 256  # Размер порции проверки
+
+    def __init__(self, on_missing, on_finished=None, max_workers=4):
+        self.on_missing = on_missing
+        self.on_finished = on_finished
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def validate(self, paths):
+        """Запускает проверку; если проверка уже идет, новая не начинается"""
+        if self.is_running():
+            return False
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, args=(paths,), name="PlaylistValidator", daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self, paths):
+        missing_count = 0
+        for i in range(0, len(paths), self.BATCH_SIZE):
+            if self.stopped.is_set():
+                return
+            batch = paths[i:i + self.BATCH_SIZE]
+            try:
+                exists = list(self.pool.map(os.path.exists, batch))
+            except RuntimeError:
+                # Пул уже остановлен - приложение завершается
+                return
+            missing = [path for path, found in zip(batch, exists) if not found]
+            if missing:
+                missing_count += len(missing)
+                self.on_missing(missing)
+        if self.on_finished and not self.stopped.is_set():
+            self.on_finished(missing_count)
+
+    def shutdown(self):
+        self.stopped.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
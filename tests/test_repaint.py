@@ -0,0 +1,117 @@
+import ast
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from components.paint_monitor import PaintRateMonitor
+from components.progress_ring import DASH_STEPS, ProgressRing
+from components.timer_engine import SimulatedClock, TimerEngine
+
+MAIN_WINDOW = Path(__file__).resolve().parent.parent / "work_clock_main.py"
+WORK = 30 * 60
+REST = 5 * 60
+
+
+def ring_repaints(engine, update_progress_indicator=None):
+    """Счетчик перерисовок обводки на каждом тике таймера.
+
+    По умолчанию обводку пересчитывает ProgressRing так же, как это делает
+    ClockWindow; update_progress_indicator - сам метод окна, если его можно
+    импортировать.
+    """
+    monitor = PaintRateMonitor("test")
+    window = SimpleNamespace(progress_ring=ProgressRing(), timer_engine=engine, update=monitor.record)
+
+    def on_tick(remaining_time):
+        if update_progress_indicator is not None:
+            update_progress_indicator(window)
+        elif window.progress_ring.update(engine.progress()):
+            window.update()
+
+    engine.on_tick = on_tick
+    return monitor
+
+
+def window_method():
+    pytest.importorskip("PyQt5.QtWidgets")
+    work_clock_main = pytest.importorskip("work_clock_main")
+    return work_clock_main.ClockWindow.update_progress_indicator
+
+
+def check_no_repaints_while_paused(update_progress_indicator=None):
+    clock = SimulatedClock()
+    engine = TimerEngine(WORK, REST, clock)
+    monitor = ring_repaints(engine, update_progress_indicator)
+    engine.start()
+    clock.advance(600)
+    engine.update()
+    engine.pause()
+    monitor.count = 0
+
+    # Час на паузе: остаток и обводка не меняются, сколько бы раз ни пересчитывали
+    for _ in range(3600):
+        clock.advance(1)
+        engine.update()
+    assert monitor.count == 0
+
+
+def check_at_most_one_repaint_per_tick(update_progress_indicator=None):
+    clock = SimulatedClock()
+    engine = TimerEngine(WORK, REST, clock)
+    monitor = ring_repaints(engine, update_progress_indicator)
+    engine.start()
+
+    ticks = 0
+    while not engine.is_rest_period:
+        clock.advance(engine.next_tick_delay() + 0.005)
+        engine.update()
+        ticks += 1
+    assert 0 < monitor.count <= ticks
+    assert monitor.count <= DASH_STEPS
+
+
+def test_no_repaints_while_paused():
+    check_no_repaints_while_paused()
+
+
+def test_at_most_one_repaint_per_tick():
+    check_at_most_one_repaint_per_tick()
+
+
+def test_window_no_repaints_while_paused():
+    check_no_repaints_while_paused(window_method())
+
+
+def test_window_at_most_one_repaint_per_tick():
+    check_at_most_one_repaint_per_tick(window_method())
+
+
+def test_progress_ring_reports_only_moves():
+    ring = ProgressRing()
+    assert not ring.reset()
+    assert not ring.update(0.0)
+    assert ring.update(0.5)
+    assert not ring.update(0.5)
+    assert ring.reset()
+
+
+def test_paint_event_does_not_call_update_directly():
+    # Узкая проверка: ловит только self.update()/self.repaint(), написанные прямо в paintEvent,
+    # но не вспомогательные методы, которые paintEvent мог бы вызвать
+    tree = ast.parse(MAIN_WINDOW.read_text(encoding="utf-8"))
+    window = next(node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == "ClockWindow")
+    paint_event = next(node for node in window.body if isinstance(node, ast.FunctionDef) and node.name == "paintEvent")
+    calls = [node.func.attr for node in ast.walk(paint_event)
+             if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+             and isinstance(node.func.value, ast.Name) and node.func.value.id == "self"]
+    assert not {"update", "repaint"}.intersection(calls)
+
+
+def test_paint_rate_report_starts_new_interval(capsys):
+    monitor = PaintRateMonitor("test")
+    for _ in range(5):
+        monitor.record()
+    monitor.report()
+    assert "всего 5" in capsys.readouterr().out
+    assert monitor.count == 0 and monitor.total == 5
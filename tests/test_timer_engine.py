@@ -0,0 +1,95 @@
+from components.timer_engine import ALARM_SECONDS, SimulatedClock, TimerEngine
+
+WORK = 30 * 60
+REST = 5 * 60
+DAY = 24 * 60 * 60
+
+
+def make_engine():
+    clock = SimulatedClock()
+    engine = TimerEngine(WORK, REST, clock)
+    events = []
+    engine.on_alarm = lambda is_rest_period: events.append(("alarm", is_rest_period, clock()))
+    engine.on_period_switched = lambda alarm_missed: events.append(("switch", alarm_missed, clock()))
+    return clock, engine, events
+
+
+def run_ticks(clock, engine, seconds, late=0.005):
+    """Тики так, как их планирует окно: по next_tick_delay() с небольшим опозданием"""
+    end = clock() + seconds
+    while clock() < end:
+        clock.advance(engine.next_tick_delay() + late)
+        engine.update()
+
+
+def test_day_of_periods():
+    clock, engine, events = make_engine()
+    engine.start()
+    run_ticks(clock, engine, DAY)
+
+    switches = [event for event in events if event[0] == "switch"]
+    # 41 полных цикла работа + перерыв за сутки, остаток суток - в рабочем периоде
+    assert len(switches) == DAY // (WORK + REST) * 2
+    assert not any(alarm_missed for _, alarm_missed, _ in switches)
+
+    # Опоздания тиков не накапливаются: каждый период начинается ровно по расписанию
+    start = 0.0
+    for index, (_, _, at) in enumerate(switches):
+        start += REST if index % 2 else WORK
+        assert start <= at < start + 0.01
+
+
+def test_alarm_once_per_period():
+    clock, engine, events = make_engine()
+    engine.start()
+    run_ticks(clock, engine, 3 * (WORK + REST))
+
+    kinds = [kind for kind, _, _ in events]
+    assert kinds == ["alarm", "switch"] * 6
+    # Сигнал в конце работы приходит с is_rest_period=False, в конце перерыва - с True
+    assert [is_rest for kind, is_rest, _ in events if kind == "alarm"] == [False, True] * 3
+    # Сигнал звучит не раньше, чем за ALARM_SECONDS до конца периода
+    period_end = WORK
+    for index in range(0, len(events), 2):
+        alarm_at = events[index][2]
+        assert period_end - ALARM_SECONDS <= alarm_at < period_end
+        period_end += REST if index // 2 % 2 == 0 else WORK
+
+
+def test_catch_up_after_suspend():
+    clock, engine, events = make_engine()
+    engine.start()
+    run_ticks(clock, engine, 60)
+
+    # Система спала 5 часов: ни одного тика за это время
+    clock.advance(5 * 60 * 60)
+    engine.update()
+
+    # Все пропущенные периоды переключаются за один вызов и одним событием
+    assert events == [("switch", True, clock())]
+    into_cycle = clock() % (WORK + REST)
+    assert engine.is_rest_period == (into_cycle >= WORK)
+    period_end = WORK if into_cycle < WORK else WORK + REST
+    assert abs(engine.remaining_time - (period_end - into_cycle)) <= 1
+
+    # После догоняющего переключения расписание идет дальше как обычно
+    events.clear()
+    run_ticks(clock, engine, WORK + REST)
+    assert [kind for kind, _, _ in events] == ["alarm", "switch", "alarm", "switch"]
+
+
+def test_pause_keeps_remaining_time():
+    clock, engine, events = make_engine()
+    engine.start()
+    run_ticks(clock, engine, 100)
+    remaining = engine.remaining_time
+
+    engine.pause()
+    assert engine.next_tick_delay() is None
+    clock.advance(60 * 60)
+    assert engine.update() == remaining
+    assert events == []
+
+    engine.start()
+    run_ticks(clock, engine, remaining)
+    assert [kind for kind, _, _ in events] == ["alarm", "switch"]
@@ -1,33 +1,39 @@
 import json
+import multiprocessing
 import os
 import sys
 from pathlib import Path
 import keyboard
-from PyQt5.QtCore import QPointF, QEasingCurve, QRect, QThread, pyqtSignal, QRectF
+from PyQt5.QtCore import QEasingCurve, QRect, QThread, pyqtSignal, QRectF, QEvent
 from PyQt5.QtCore import QTimer
 from PyQt5.QtCore import Qt, QPropertyAnimation
-from PyQt5.QtGui import QConicalGradient, QIcon, QFontDatabase, QPixmap, QPainterPath
-from PyQt5.QtGui import QPainter, QColor, QBrush, QPen
+from PyQt5.QtGui import QIcon, QFontDatabase, QPainterPath
+from PyQt5.QtGui import QPainter, QColor
 from PyQt5.QtSvg import QSvgWidget
 from PyQt5.QtWidgets import QMainWindow, QWidget, QApplication, QVBoxLayout, QLineEdit, QLabel, QHBoxLayout, QSlider, \
     QFileDialog, QSystemTrayIcon, QMenu, QAction
 
+from components.audio_latency import measure_output_latency, print_latency_report
+from components.artwork_cache import ArtworkCache
 from components.checkbox import CheckboxWidget
 from components.color_scheme_square import ColorSchemeSquare
 from components.flip_window import FlipCard
 from components.intelval_widget import IntervalInputWidget
 from components.play_button import PlayButton
 from components.player import AudioPlayerThread
+from components.progress_ring import ProgressRing
+from components.ring_cache import RingCache
 from components.service_button import ServiceButton
+from components.paint_monitor import PaintRateMonitor
 from components.pick_music_folder_button import PickMusicFolderButton
 from components.slider import Slider
 from components.time_label import TimeLabel
+from components.timer_engine import TimerEngine
 from components.toucan_button import ToucanButton
 from components.utils import getPathString, get_resource_path, check_settings, load_settings, log_error
 from components.utils import lighten_color_subtract
 
 
-
 class GlobalKeyListener(QThread):
     """Поток для отслеживания глобальных нажатий клавиш"""
     key_pressed = pyqtSignal(str)
@@ -92,8 +98,11 @@ class ClockWindow(QMainWindow):
 
 
         self.color_schemes_list = {}
-        self.toucan_full = QPixmap(str(resource_path/"toucan/toucan_full.png"))
-        self.toucan_wrap = QPixmap(str(resource_path/"toucan/toucan_wrap.png"))
+        # Картинки тукана грузятся только при выборе его схемы
+        self.toucan_artwork = ArtworkCache({
+            "full": resource_path / "toucan/toucan_full.png",
+            "wrap": resource_path / "toucan/toucan_wrap.png",
+        })
 
         self.drag_pos = None
         self.set_window_flags(self.lock_window)
@@ -101,22 +110,23 @@ class ClockWindow(QMainWindow):
         self.setGeometry(self.x_value, self.y_value, 330, 900)
 
         # ПЕРЕМЕННАЯ ВЕЛИЧИНА СДВИГА ИНДИКАТОРА
-        self.start_dash = 1.0
-
-        # ПЕРИОДЫ ТАЙМЕРА (в секундах)
-        self.rest_interval = int(self.settings['rest_interval']) * 60  # 5 минут перерыв
-        self.work_interval = int(self.settings['work_interval']) * 60  # 25 минут работа
+        self.progress_ring = ProgressRing()
+        self.ring_cache = RingCache()  # Готовые кадры обводки
 
-        # Состояние таймера
-        self.is_running = False
-        self.is_rest_period = False  # False = работа, True = перерыв
-        self.remaining_time = 0  # Сколько секунд осталось до конца периода
+        # ТАЙМЕР РАБОТА/ПЕРЕРЫВ (периоды в секундах)
+        self.timer_engine = TimerEngine(int(self.settings['work_interval']) * 60,
+                                        int(self.settings['rest_interval']) * 60)
+        self.timer_engine.on_tick = self.on_timer_tick
+        self.timer_engine.on_alarm = self.on_timer_alarm
+        self.timer_engine.on_period_switched = self.on_period_switched
 
         # ГЛАВНЫЙ КОНТЕЙНЕР
         self.root_container = QWidget(self)
         self.inner_total_x = 15
         self.inner_total_y = 15
         self.root_container.setGeometry(self.inner_total_x, self.inner_total_y, 300, 120)
+        # Обводка рисуется вокруг контейнера - перерисовываем окно, когда он меняет размер
+        self.root_container.installEventFilter(self)
         if self.current_color_scheme==5:
             self.root_container.setStyleSheet("""
                                    QWidget{
@@ -149,7 +159,8 @@ class ClockWindow(QMainWindow):
         # Таймер
         self.tick_timer = QTimer()
         self.tick_timer.timeout.connect(self.tick_tack)
-        self.tick_timer.setInterval(1000)  # Обновление каждую секунду
+        self.tick_timer.setSingleShot(True)  # Каждый тик планируется на границу следующей секунды
+        self.tick_timer.setTimerType(Qt.PreciseTimer)
 
         # Основной layout для корневого контейнера
         main_layout = QVBoxLayout(self.root_container)
@@ -186,10 +197,16 @@ class ClockWindow(QMainWindow):
         self.timer_label.fontChanged.connect(self.save_settings)
 
         # ПЛЕЕР МУЗЫКИ
-        self.audio_player = AudioPlayerThread(self.volume/100)
+        self.audio_player = AudioPlayerThread(self.volume/100, int(self.settings['prefetch_memory_mb']),
+                                              int(self.settings['crossfade_ms']), self.settings['fade_curve'],
+                                              self.settings['audio_process'], self.settings['normalize_loudness'],
+                                              int(self.settings['history_depth']), self.get_mixer_settings())
         self.audio_player.start()
+        # При любом выходе из приложения плеер останавливает свои потоки и дописывает корзину
+        QApplication.instance().aboutToQuit.connect(self.audio_player.quit)
         self.audio_player.set_music_folder(self.settings['music_path'])
         self.audio_player.random = self.settings['random']
+        self.audio_player.switch_watch_folder(self.settings['watch_music_folder'])
 
         # КНОПКА ОТКРЫТЬ
         self.open_button = ServiceButton('▼', 120)
@@ -215,7 +232,8 @@ class ClockWindow(QMainWindow):
         hbox.addWidget(self.time_widget)
 
         # КОНТЕЙНЕР НАСТРОЕК
-        self.flip_card = FlipCard(self.first_gradient_color)
+        self.flip_card = FlipCard(self.first_gradient_color, self.audio_player.metadata,
+                                  self.audio_player.playlist)
         self.audio_player.update_song_history.connect(self.flip_card.update_song_history)
         main_layout.addWidget(self.flip_card, alignment=Qt.AlignBottom)
         self.bottom_widget = QWidget()
@@ -248,14 +266,14 @@ class ClockWindow(QMainWindow):
         first_settings_hbox.setSpacing(10)
 
         # ВВОД РАБОЧЕГО ПЕРИОДА
-        self.work_interval_widget = IntervalInputWidget(self, self.work_interval, "Сколько работать", "icons/work_white.svg")
+        self.work_interval_widget = IntervalInputWidget(self, self.timer_engine.work_interval, "Сколько работать", "icons/work_white.svg")
         self.work_interval_widget.textChanged.connect(lambda text: {
             self.handle_work_text_input(text, self.work_interval_widget)
         })
         first_settings_hbox.addWidget(self.work_interval_widget)
 
         # ВВОД ПЕРИОДА ОТДЫХА
-        self.rest_interval_widget = IntervalInputWidget(self, self.rest_interval, "Сколько отдыхать", "icons/rest_white.svg")
+        self.rest_interval_widget = IntervalInputWidget(self, self.timer_engine.rest_interval, "Сколько отдыхать", "icons/rest_white.svg")
         self.rest_interval_widget.textChanged.connect(lambda text: {
             self.handle_rest_text_input(text, self.rest_interval_widget)
         })
@@ -385,6 +403,18 @@ class ClockWindow(QMainWindow):
         self.init_tray()
         self.load_fonts()
 
+        # Проверка частоты перерисовок (запуск с --paint-stats)
+        self.paint_monitor = PaintRateMonitor("ClockWindow")
+        self.paint_stats_timer = QTimer()
+        self.paint_stats_timer.timeout.connect(self.paint_monitor.report)
+        if "--paint-stats" in sys.argv:
+            self.paint_stats_timer.start(5000)
+
+    def eventFilter(self, obj, event):
+        if obj is self.root_container and event.type() in (QEvent.Resize, QEvent.Move):
+            self.update()
+        return super().eventFilter(obj, event)
+
     # ОБРАБОТКА КЛАВИШ ДЛЯ ПЕРЕКЛЮЧЕНИЯ ТРЕКОВ
     def on_key_pressed(self, key_name):
         if key_name == 'page up':
@@ -421,11 +451,11 @@ class ClockWindow(QMainWindow):
         else:
             field.setText("30")
 
-        if not self.is_rest_period:
+        if not self.timer_engine.is_rest_period:
             new_work_interval = int(self.work_interval_widget.text()) * 60
-            if self.work_interval != new_work_interval:
-                self.work_interval = new_work_interval
-                self.time_slider.setRange(0, self.work_interval - 8)
+            if self.timer_engine.work_interval != new_work_interval:
+                self.timer_engine.work_interval = new_work_interval
+                self.time_slider.setRange(0, self.timer_engine.work_interval - 8)
             self.time_slider.setValue(0)
             self.set_remain_time(0)
 
@@ -460,11 +490,11 @@ class ClockWindow(QMainWindow):
         else:
             field.setText("5")
 
-        if self.is_rest_period:
+        if self.timer_engine.is_rest_period:
             new_rest_interval = int(self.rest_interval_widget.text()) * 60
-            if self.rest_interval != new_rest_interval:
-                self.rest_interval = new_rest_interval
-                self.time_slider.setRange(0, self.rest_interval - 8)
+            if self.timer_engine.rest_interval != new_rest_interval:
+                self.timer_engine.rest_interval = new_rest_interval
+                self.time_slider.setRange(0, self.timer_engine.rest_interval - 8)
             self.time_slider.setValue(0)
             self.set_remain_time(0)
 
@@ -531,6 +561,9 @@ class ClockWindow(QMainWindow):
             self.second_gradient_color = second_color
             self.play_button.set_second_gradient_color(second_color)
             self.timer_label.set_background_transparency(0.0)
+            # Тукан больше не показывается - освобождаем картинки
+            self.toucan_artwork.release()
+        self.update()
         self.save_settings()
 
     def update_button_style(self, button, color):
@@ -626,6 +659,13 @@ class ClockWindow(QMainWindow):
         tray_menu.addAction(previous_song_action)
         tray_menu.addSeparator()
 
+        self.undo_delete_action = QAction("Вернуть удаленный трек", self)
+        self.undo_delete_action.setEnabled(False)
+        self.undo_delete_action.triggered.connect(self.audio_player.undo_delete)
+        self.audio_player.trash.pending_changed.connect(lambda count: self.undo_delete_action.setEnabled(count > 0))
+        tray_menu.addAction(self.undo_delete_action)
+        tray_menu.addSeparator()
+
         quit_action = QAction("Закрыть", self)
         quit_action.setIcon(QIcon(get_resource_path("resources/tray_icons/quit.ico")))
         quit_action.triggered.connect(self.quit_app)
@@ -646,6 +686,14 @@ class ClockWindow(QMainWindow):
             else:
                 self.show()
 
+    def get_mixer_settings(self):
+        return {
+            "frequency": int(self.settings['mixer_frequency']),
+            "size": int(self.settings['mixer_size']),
+            "channels": int(self.settings['mixer_channels']),
+            "buffer": int(self.settings['mixer_buffer']),
+        }
+
     def quit_app(self):
         self.tray_icon.hide()
         QApplication.quit()
@@ -659,6 +707,7 @@ class ClockWindow(QMainWindow):
             'rest_interval': self.rest_interval_widget.text() if self.rest_interval_widget.text() != "" else "5",
             'music_path': self.audio_player.path_to_music,
             'random': self.audio_player.random,
+            'watch_music_folder': self.audio_player.watch_folder,
             'background_color': self.background_color,
             "first_gradient_color": self.first_gradient_color,
             "second_gradient_color": self.second_gradient_color,
@@ -666,6 +715,16 @@ class ClockWindow(QMainWindow):
             "background_transparency": self.background_transparency,
             "current_color_scheme": self.current_color_scheme,
             "volume":self.play_button.getVolume(),
+            "prefetch_memory_mb": self.audio_player.prefetcher.memory_limit_mb,
+            "crossfade_ms": self.audio_player.engine.crossfade_ms,
+            "fade_curve": self.audio_player.fader.curve,
+            "audio_process": self.audio_player.audio_process,
+            "normalize_loudness": self.audio_player.normalize_loudness,
+            "history_depth": self.audio_player.history.depth,
+            "mixer_frequency": self.audio_player.engine.mixer_settings["frequency"],
+            "mixer_size": self.audio_player.engine.mixer_settings["size"],
+            "mixer_channels": self.audio_player.engine.mixer_settings["channels"],
+            "mixer_buffer": self.audio_player.engine.mixer_settings["buffer"],
             "scheme_1_first_color": self.scheme_1_first_color,
             "scheme_1_second_color": self.scheme_1_second_color,
             "scheme_2_first_color": self.scheme_2_first_color,
@@ -694,125 +753,96 @@ class ClockWindow(QMainWindow):
             self.save_settings()
 
     def set_remain_time(self, value):
-        if self.is_rest_period:
-            self.remaining_time = self.rest_interval - value
-        else:
-            self.remaining_time = self.work_interval - value
-        self.update_timer()
+        self.timer_engine.set_remaining(self.timer_engine.interval() - value)
+        if self.timer_engine.is_running:
+            self.schedule_tick()
+        self.timer_engine.update()
 
     def play_pause(self, is_playing):
         # Запуск/пауза музыки
         self.audio_player.switch_play_pause(is_playing)
 
         # Запуск/пауза таймера
-        if not self.is_running:
+        if not self.timer_engine.is_running:
             self.start_timer()
         else:
             self.pause_timer()
 
     def start_timer(self):
         """Запуск таймера"""
-        if not self.is_running:
-            self.is_running = True
-            self.tick_timer.start()
+        if not self.timer_engine.is_running:
+            self.timer_engine.start()
+            self.schedule_tick()
 
     def pause_timer(self):
         """Пауза таймера"""
-        if self.is_running:
-            self.is_running = False
+        if self.timer_engine.is_running:
+            self.timer_engine.pause()
             self.tick_timer.stop()
 
+    def schedule_tick(self):
+        """Следующий тик - сразу после того, как остаток уменьшится на секунду"""
+        self.tick_timer.start(max(1, int(self.timer_engine.next_tick_delay() * 1000) + 5))
+
     def tick_tack(self):
         # ОБНОВЛЯЕМ СЛАЙДЕР
-        self.update_timer()
+        self.timer_engine.update()
+        if self.timer_engine.is_running:
+            self.schedule_tick()
 
-    def update_timer(self):
-        """Обновление таймера каждую секунду"""
-        self.remaining_time -= 1
-
-        # Обновляем отображение времени
+    def on_timer_tick(self, remaining_time):
+        """Остаток пересчитан - обновляем отображение"""
         if not self.play_button.is_deleting:
-            minutes = self.remaining_time // 60
-            seconds = self.remaining_time % 60
+            minutes = remaining_time // 60
+            seconds = remaining_time % 60
             self.timer_label.setText(f"{minutes:02d}:{seconds:02d}")
 
         # Обновляем индикатор обводки
         self.update_progress_indicator()
 
-        if self.remaining_time == 4:
-            self.audio_player.play_alarm()
-            if not self.is_rest_period:
-                self.audio_player.stop_music(5000)
+    def on_timer_alarm(self, is_rest_period):
+        self.audio_player.play_alarm()
+        if not is_rest_period:
+            self.audio_player.stop_music(5000)
+
+    def on_period_switched(self, alarm_missed):
+        """Переключение между работой и перерывом"""
+        if not self.timer_engine.is_rest_period:
+            # Завершился перерыв, начинаем работу
+            self.audio_player.play_music()
+        elif alarm_missed:
+            # Сигнал в конце работы был пропущен - выключаем музыку сейчас
+            self.audio_player.stop_music(5000)
 
+        # Сбрасываем индикатор (цвета обводки меняются вместе с периодом, перерисовываем всегда)
+        self.progress_ring.reset()
+        self.update()
 
-        # Если время вышло
-        if self.remaining_time <= 0:
-            if self.is_rest_period:
-                self.audio_player.play_music()
-            self.switch_period()
+        self.time_slider.setValue(0)
+        self.time_slider.setRange(0, self.timer_engine.remaining_time - 6)
 
     def update_time_slider(self):
-        if self.is_rest_period:
-            self.time_slider.setValue(self.rest_interval - self.remaining_time)
-        else:
-            self.time_slider.setValue(self.work_interval - self.remaining_time)
+        self.time_slider.setValue(self.timer_engine.interval() - self.timer_engine.remaining_time)
 
     def update_progress_indicator(self):
         """Обновление индикатора прогресса (обводки)"""
-        if self.is_rest_period:
-
-            # Для перерыва: от 0.98 до 0 по мере уменьшения времени
-            total_time = self.rest_interval
-            elapsed = total_time - self.remaining_time
-
-            progress = elapsed / total_time
-            self.start_dash = 1 - (progress * 0.99)
-        else:
-
-            # Для работы: от 0.98 до 0 по мере уменьшения времени
-            total_time = self.work_interval
-            elapsed = total_time - self.remaining_time
-
-            progress = elapsed / total_time
-            self.start_dash = 1 - (progress * 0.99)
-
-        # Ограничиваем значение в пределах 0-0.98
-        self.start_dash = max(0.0, min(1, self.start_dash))
-
-        # Обновляем отрисовку
-        self.update()
-
-    def switch_period(self):
-        """Переключение между работой и перерывом"""
-        if self.is_rest_period:
-            # Завершился перерыв, начинаем работу
-            self.is_rest_period = False
-            self.remaining_time = self.work_interval
-        else:
-            # Завершилась работа, начинаем перерыв
-            self.is_rest_period = True
-            self.remaining_time = self.rest_interval
-
-        # Сбрасываем индикатор
-        self.start_dash = 1
-
-        self.time_slider.setValue(0)
-        self.time_slider.setRange(0, self.remaining_time - 6)
+        # Перерисовываем только если обводка действительно сдвинулась на шаг кадра
+        if self.progress_ring.update(self.timer_engine.progress()):
+            self.update()
 
     def reset_timer(self):
         """Сброс таймера"""
         self.pause_timer()
-        self.is_rest_period = False
-        self.remaining_time = self.work_interval
-        self.start_dash = 1  # Полная обводка
+        self.timer_engine.reset()
+        self.progress_ring.reset()  # Полная обводка
 
-        minutes = self.remaining_time // 60
-        seconds = self.remaining_time % 60
+        minutes = self.timer_engine.remaining_time // 60
+        seconds = self.timer_engine.remaining_time % 60
         self.timer_label.setText(f"{minutes:02d}:{seconds:02d}")
 
         self.play_button.is_playing = False
         self.time_slider.setValue(0)
-        self.time_slider.setRange(0, self.remaining_time - 8)
+        self.time_slider.setRange(0, self.timer_engine.remaining_time - 8)
         self.update()
 
     def open_settings(self):
@@ -822,6 +852,7 @@ class ClockWindow(QMainWindow):
             self.flip_card.show()
             self.open_button.hide()
             self.open_settings_animation.start()
+            self.update()
 
     def close_settings(self):
         """Закрывает настройки - скрываем нижнюю часть и уменьшаем контейнер"""
@@ -830,35 +861,19 @@ class ClockWindow(QMainWindow):
         self.open_button.show()
         self.close_settings_animation.start()
         self.settings_closed = True
+        self.update()
 
     def paintEvent(self, event):
+        # Окно перерисовывается только по self.update() при изменении обводки, цветов или размеров
+        self.paint_monitor.record()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
-
-
-        # ГРАДИЕНТНАЯ ЦВЕТНАЯ ОБВОДКА
-        gradient = QConicalGradient()  # Конический градиент
-        gradient.setCenter(QPointF(self.root_container.rect().center()))
-        gradient.setAngle(90)  # Текущий угол анимации
-        painter.setBrush(QBrush(QColor("transparent")))
-
-        if not self.is_rest_period:
-            gradient.setColorAt(1.00, QColor(self.first_gradient_color))
-            gradient.setColorAt(0.999, QColor("transparent"))
-            gradient.setColorAt(self.start_dash, QColor("transparent"))
-            gradient.setColorAt(self.start_dash - 0.01, QColor(self.second_gradient_color))
-            gradient.setColorAt(0.00, QColor(self.first_gradient_color))
-        else:
-            gradient.setColorAt(1.00, QColor(self.first_gradient_color))
-            gradient.setColorAt(0.999, QColor(self.first_gradient_color))
-            gradient.setColorAt(self.start_dash, QColor(self.second_gradient_color))
-            gradient.setColorAt(self.start_dash - 0.01, QColor("transparent"))
-            gradient.setColorAt(0.00, QColor("transparent"))
-
-        pen = QPen(QBrush(gradient), 10)
-        painter.setPen(pen)
-        painter.drawRoundedRect(self.inner_total_x - 10, self.inner_total_y - 10, self.root_container.width() + 20,self.root_container.height() + 20, 69, 69)
+        # ГРАДИЕНТНАЯ ЦВЕТНАЯ ОБВОДКА - готовый кадр из кэша
+        painter.drawPixmap(0, 0, self.ring_cache.pixmap(
+            self.progress_ring.dash, self.timer_engine.is_rest_period, self.first_gradient_color, self.second_gradient_color,
+            self.inner_total_x, self.inner_total_y, self.root_container.width(), self.root_container.height(),
+            self.devicePixelRatioF()))
 
         if self.current_color_scheme ==5:
             painter.setBrush(QColor("#1B2228"))
@@ -866,28 +881,13 @@ class ClockWindow(QMainWindow):
             painter.drawRoundedRect(self.inner_total_x, self.inner_total_y, self.root_container.width(),
                                     self.root_container.height(), 59, 59)
 
+            # Рисуем изображение, уже масштабированное под размер виджета
             if not self.settings_closed:
-                # Рисуем изображение
-                if self.toucan_full:
-                    # Масштабируем под размер виджета
-                    scaled_pixmap = self.toucan_full.scaled(
-                        300,300,
-                        Qt.IgnoreAspectRatio,
-                        Qt.SmoothTransformation
-                    )
-                    painter.drawPixmap(self.inner_total_x, self.inner_total_y, scaled_pixmap)
-
+                toucan = self.toucan_artwork.pixmap("full", 300, 300, self.devicePixelRatioF())
             else:
-                # Рисуем изображение
-                if self.toucan_wrap:
-                    # Масштабируем под размер виджета
-                    scaled_pixmap = self.toucan_wrap.scaled(
-                        300, 120,
-                        Qt.IgnoreAspectRatio,
-                        Qt.SmoothTransformation
-                    )
-                    painter.drawPixmap(self.inner_total_x, self.inner_total_y, scaled_pixmap)
-        self.update()
+                toucan = self.toucan_artwork.pixmap("wrap", 300, 120, self.devicePixelRatioF())
+            if toucan is not None:
+                painter.drawPixmap(self.inner_total_x, self.inner_total_y, toucan)
 
     # СРАБАТЫВАЕТ ПРИ НАЖАТИИ
     def mousePressEvent(self, event):
@@ -954,8 +954,18 @@ class ClockWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Нужно для процесса звука в собранном .exe
+    multiprocessing.freeze_support()
     version = "2.0.8"
 
+    if "--measure-audio" in sys.argv:
+        # Подбор буфера микшера под конкретную машину: задержка и опустошения для каждого размера
+        settings = load_settings() or {}
+        print_latency_report(measure_output_latency(int(settings.get("mixer_frequency", 44100)),
+                                                    int(settings.get("mixer_size", -16)),
+                                                    int(settings.get("mixer_channels", 2))))
+        sys.exit(0)
+
     try:
         app = QApplication(sys.argv)
         app.setQuitOnLastWindowClosed(False)